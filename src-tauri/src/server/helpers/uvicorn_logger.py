@@ -1,14 +1,16 @@
 import sys
-import json
-import re
+import queue
+import atexit
 
 import logging
-from typing import Any, Mapping
-from logging.handlers import RotatingFileHandler
+from dataclasses import is_dataclass
+from typing import Any, Callable
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
+import orjson
 from fastapi import WebSocket, Request
 
-from utils import make_size_human_readable, safe_json_loads
+from utils import make_size_human_readable, safe_json_loads, EMAIL_PATTERN
 from consts import APP_NAME
 from internal.file_system import FileSystem
 
@@ -26,9 +28,54 @@ CENSOR_TRACE_LENGTH = 10
 Sensitive Data Masking Patterns
 """
 SENSITIVE_PATTERNS = [
-    re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'),  # Email pattern
+    EMAIL_PATTERN,
 ]
 
+class _Lazy:
+    """Calls `func` only when the log record is actually formatted."""
+    __slots__ = ("_func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self._func = func
+
+    def __str__(self) -> str:
+        try:
+            return str(self._func())
+        except Exception as e:
+            return f"<could not be summarized: {e}>"
+
+class _SensitiveDataFilter(logging.Filter):
+    """
+    Masks sensitive data of the formatted message. Attached to the
+    handlers of the queue listener, so messages are formatted and masked
+    on the listener's thread instead of the calling thread. Records are
+    shared by the handlers, so every record is masked only once.
+    """
+    def __init__(self, mask: Callable[[str], str]):
+        super().__init__()
+        self._mask = mask
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "masked", False):
+            # Raising here would kill the listener's thread and every
+            # following record would be silently dropped.
+            try:
+                record.msg = self._mask(record.getMessage())
+            except Exception as e:
+                record.msg = f"Log message could not be formatted: {e} ({record.msg!r})"
+            record.args = None
+            record.masked = True
+        return True
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueues records as they are. `QueueHandler.prepare` formats the
+    message on the calling thread for pickling, which is not needed for
+    an in-process queue and would evaluate the `_Lazy` arguments early.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 class UvicornLogger(logging.Logger):
     def __init__(self):
         super().__init__(APP_NAME)
@@ -49,8 +96,23 @@ class UvicornLogger(logging.Logger):
         )
         file_handler.setFormatter(formatter)
 
-        self.addHandler(stream_handler)
-        self.addHandler(file_handler)
+        sensitive_data_filter = _SensitiveDataFilter(self._find_sensitive_keywords)
+        stream_handler.addFilter(sensitive_data_filter)
+        file_handler.addFilter(sensitive_data_filter)
+
+        # Records are only enqueued on the calling thread, writing them
+        # to stdout and to the (rotating) log file is done by the
+        # listener's own thread.
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        self.addHandler(_DeferredQueueHandler(log_queue))
+        self._queue_listener = QueueListener(
+            log_queue,
+            stream_handler,
+            file_handler,
+            respect_handler_level=True
+        )
+        self._queue_listener.start()
+        atexit.register(self._queue_listener.stop)
 
     def _mask(self, text: str) -> str:
         return f"{text[1:DATA_PREVIEW_LENGTH]}{"*" * CENSOR_TRACE_LENGTH}"
@@ -61,7 +123,7 @@ class UvicornLogger(logging.Logger):
 
         if isinstance(data, dict):
             return {
-                key: f"{self._mask(json.dumps(value))}" if value else ""
+                key: f"{self._mask(orjson.dumps(value, default=str).decode())}" if value else ""
                 for key, value in data.items()
             }
         elif isinstance(data, list):
@@ -71,32 +133,47 @@ class UvicornLogger(logging.Logger):
 
         return "`data` could not censored properly."
 
-    def _summarize(self, data: Any) -> dict | str:
-        if isinstance(data, dict):
-            return {key: self._summarize(value) for key, value in data.items()}
-        elif isinstance(data, list):
-            return self._summarize(str(data))
-        elif isinstance(data, str) and len(data) >= MAX_SUMMARIZED_DATA_LENGTH:
+    def _truncate(self, data: Any) -> Any:
+        if isinstance(data, (dict, list, tuple)) or is_dataclass(data):
+            # Serialized in C and cut right away instead of walking
+            # the whole container in python.
+            data = orjson.dumps(data, default=str)[:MAX_SUMMARIZED_DATA_LENGTH].decode(errors="ignore")
+        if isinstance(data, str) and len(data) >= MAX_SUMMARIZED_DATA_LENGTH:
             return f"{data[:MAX_SUMMARIZED_DATA_LENGTH]}...{']' if data.startswith('[') else ''}"
         return data
 
+    def _summarize(self, data: Any) -> dict | str:
+        # Only the top level is kept as is, nested values are
+        # summarized as truncated json strings.
+        if isinstance(data, dict):
+            return {key: self._truncate(value) for key, value in data.items()}
+        return self._truncate(data)
+
     def request(self, request: Request, response: Any) -> None:
         try:
-            response_data = safe_json_loads(response._body)
-            if isinstance(response_data, dict) and "data" in response_data.keys():
-                response_data["data"] = self._censor(response_data["data"])
-
-            log_message = (
-                f"{request.method} {request.url} - {response.status_code} - "
-                f"{self._summarize(response_data)} - "
-                f"{make_size_human_readable(int(response.headers.get('content-length', '0')))}"
+            status_code = response.status_code
+            if status_code == 307: # Temporary Redirect
+                return
+            if status_code < 400 and not self.isEnabledFor(logging.INFO):
+                return
+
+            def summarize_response() -> dict | str:
+                response_data = safe_json_loads(response._body)
+                if isinstance(response_data, dict) and "data" in response_data.keys():
+                    response_data["data"] = self._censor(response_data["data"])
+                return self._summarize(response_data)
+
+            content_length = response.headers.get('content-length')
+            log = self.error if status_code >= 400 else self.info
+            log(
+                "%s %s - %s - %s - %s",
+                request.method,
+                request.url,
+                status_code,
+                _Lazy(summarize_response),
+                make_size_human_readable(int(content_length)) if content_length else '?'
             )
 
-            if response.status_code >= 400:
-                self.error(log_message)
-            elif response.status_code != 307: # Temporary Redirect
-                self.info(log_message)
-
         except Exception as e:
             self.error("Error while logging request and response: %s" % str(e))
 
@@ -129,73 +206,3 @@ class UvicornLogger(logging.Logger):
                 masked = self._mask(match)
                 msg = msg.replace(match, masked)
         return msg
-
-    def info(
-        self,
-        msg: object,
-        *args: object,
-        exc_info: Any = None,
-        stack_info: bool = False,
-        stacklevel: int = 1,
-        extra: Mapping[str, object] | None = None
-    ) -> None:
-        if isinstance(msg, str):
-            msg = self._find_sensitive_keywords(msg)
-        super().info(msg, *args, exc_info=exc_info, stack_info=stack_info,
-                     stacklevel=stacklevel, extra=extra)
-
-    def debug(
-        self,
-        msg: object,
-        *args: object,
-        exc_info: Any = None,
-        stack_info: bool = False,
-        stacklevel: int = 1,
-        extra: Mapping[str, object] | None = None
-    ) -> None:
-        if isinstance(msg, str):
-            msg = self._find_sensitive_keywords(msg)
-        super().debug(msg, *args, exc_info=exc_info, stack_info=stack_info,
-                      stacklevel=stacklevel, extra=extra)
-
-    def warning(
-        self,
-        msg: object,
-        *args: object,
-        exc_info: Any = None,
-        stack_info: bool = False,
-        stacklevel: int = 1,
-        extra: Mapping[str, object] | None = None
-    ) -> None:
-        if isinstance(msg, str):
-            msg = self._find_sensitive_keywords(msg)
-        super().warning(msg, *args, exc_info=exc_info, stack_info=stack_info,
-                        stacklevel=stacklevel, extra=extra)
-
-    def error(
-        self,
-        msg: object,
-        *args: object,
-        exc_info: Any = None,
-        stack_info: bool = False,
-        stacklevel: int = 1,
-        extra: Mapping[str, object] | None = None
-    ) -> None:
-        if isinstance(msg, str):
-            msg = self._find_sensitive_keywords(msg)
-        super().error(msg, *args, exc_info=exc_info, stack_info=stack_info,
-                      stacklevel=stacklevel, extra=extra)
-
-    def critical(
-        self,
-        msg: object,
-        *args: object,
-        exc_info: Any = None,
-        stack_info: bool = False,
-        stacklevel: int = 1,
-        extra: Mapping[str, object] | None = None
-    ) -> None:
-        if isinstance(msg, str):
-            msg = self._find_sensitive_keywords(msg)
-        super().critical(msg, *args, exc_info=exc_info, stack_info=stack_info,
-                         stacklevel=stacklevel, extra=extra)
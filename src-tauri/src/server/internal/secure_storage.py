@@ -1,14 +1,19 @@
 from __future__ import annotations
+import atexit
 import base64
-import copy
+import functools
 import os
-import json
+import sys
 import time
+import threading
 from enum import Enum
-from typing import TypedDict, Any, cast
+from dataclasses import dataclass, fields, replace
+from typing import Any, cast
 
 import keyring
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+import orjson
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives import serialization, hashes
 
@@ -84,21 +89,52 @@ class SecureStorageKeyValueType(str, Enum):
     def __str__(self) -> str:
         return self.value
 
-class SecureStorageKeyValue(TypedDict):
+@dataclass(slots=True)
+class SecureStorageKeyValue:
     value: Any
     type: SecureStorageKeyValueType
     created_at: float
     last_updated_at: float
 
+    def __getitem__(self, item):
+        """Allows dictionary-like access to dataclass attributes."""
+        return getattr(self, item)
+
+    def keys(self):
+        """Returns a list of all field names in the dataclass instance."""
+        return [field.name for field in fields(self)]
+
+    def copy(self) -> SecureStorageKeyValue:
+        return replace(self)
+
 """
 Constants
 """
 MAX_BACKUP_COUNT = 5
+PEM_CACHE_SIZE = 8
+AESGCM_NONCE_SIZE = 12
+AESGCM_TAG_SIZE = 16
+# Marks values encrypted with ChaCha20-Poly1305 by `AESGCMCipher`, values
+# without it are AES-GCM encrypted. ":" is not in the base64 alphabet.
+CHACHA20_PREFIX = "chacha20:"
+# Marks values encrypted as an RSA wrapped AES-GCM envelope, ":" is
+# not in the base64 alphabet so it can not collide with plain RSA-OAEP
+# ciphertexts (which are still produced by the client).
+RSA_ENVELOPE_PREFIX = "rsa-aesgcm:"
 SECURE_STORAGE_KEY_LIST = SecureStorageKey.keys()
 SECURE_STORAGE_ILLEGAL_ACCESS_KEY_LIST = [
     SecureStorageKey.AESGCMCipherKey,
     SecureStorageKey.Backups
 ]
+# For membership checks. `SecureStorageKey` is a str enum, so both
+# plain strings and enum members can be looked up without `str()`.
+SECURE_STORAGE_KEY_SET = frozenset(SECURE_STORAGE_KEY_LIST)
+SECURE_STORAGE_KEY_VALUE_TYPE_SET = frozenset(SecureStorageKeyValueType.keys())
+SECURE_STORAGE_ILLEGAL_ACCESS_KEY_SET = frozenset(str(key) for key in SECURE_STORAGE_ILLEGAL_ACCESS_KEY_LIST)
+
+# Keep decrypted values in memory for CACHE_TTL instead of decrypting
+# them on every read, set to False to decrypt on every read.
+CACHE_DECRYPTED_VALUES = True
 
 # TTL in seconds
 CACHE_TTL = 1800
@@ -108,22 +144,30 @@ ROTATE_FAILURE_TTL = ROTATE_KEY_TTL / 2
 class SecureStorage:
     _instance = None
     _cache: SecureStorageCache
+    _keyring_cache: dict[SecureStorageKey, tuple[str, SecureStorageKeyValue] | None]
+    # {(key_name, associated_data): (encrypted_value, decrypted_value, cached_at)}
+    _plain_cache: dict[tuple[SecureStorageKey, bytes | None], tuple[str, str, float]]
     _encryptor: AESGCMCipher
+    _rsa_cipher_ready: threading.Event
 
     def __new__(cls):
         if not cls._instance:
             cls._instance = super().__new__(cls)
             cls._instance._cache = SecureStorageCache()
+            cls._instance._keyring_cache = {}
+            cls._instance._plain_cache = {}
+            cls._instance._rsa_cipher_ready = threading.Event()
+            cls._instance._rsa_cipher_ready.set()
             cls._instance._init_aesgcm_cipher()
             cls._instance._init_rsa_cipher()
+            # Clear cached values on exit explicitly instead of in `__del__`,
+            # which may run while the interpreter is half torn down.
+            atexit.register(cls._instance.clear)
 
         return cls._instance
 
-    def __del__(self):
-        self.clear()
-
     def _is_key_value_type_valid(self, key_value_type: SecureStorageKeyValueType):
-        if key_value_type not in SecureStorageKeyValueType.keys():
+        if key_value_type not in SECURE_STORAGE_KEY_VALUE_TYPE_SET:
             raise InvalidSecureStorageKeyValueTypeError(f"Invalid secure storage key value type: {key_value_type}")
 
     def _create_key_value_dict(self,
@@ -138,27 +182,53 @@ class SecureStorage:
             last_updated_at=time.time(),
         )
 
+    @staticmethod
+    def _coerce_to_str(value: Any) -> str:
+        # Ciphers only accept `str`, non-str values are serialized
+        # here once instead of being checked in every cipher call.
+        return value if isinstance(value, str) else orjson.dumps(value).decode()
+
     def _serialize_key_value_dict(self, key_value_dict: SecureStorageKeyValue) -> str:
-        return json.dumps(key_value_dict)
+        return orjson.dumps(key_value_dict).decode()
 
-    def _parse_key_value_dict(self, key_value: str) -> SecureStorageKeyValue:
-        return cast(SecureStorageKeyValue, safe_json_loads(key_value))
+    def _parse_key_value_dict(self, key_value: str) -> SecureStorageKeyValue | None:
+        key_value_dict = safe_json_loads(key_value)
+        if not isinstance(key_value_dict, dict) or not key_value_dict:
+            return None
+        return SecureStorageKeyValue(**key_value_dict)
 
     def _is_key_valid(self, key: str | SecureStorageKey):
-        if str(key) not in SECURE_STORAGE_KEY_LIST:
+        if key not in SECURE_STORAGE_KEY_SET:
             raise InvalidSecureStorageKeyError(f"Invalid secure storage key: {key}")
 
     def _is_key_legal(self, key: str | SecureStorageKey):
-        if str(key) in SECURE_STORAGE_ILLEGAL_ACCESS_KEY_LIST:
+        if key in SECURE_STORAGE_ILLEGAL_ACCESS_KEY_SET:
             raise IllegalSecureStorageKeyError(f"Access to {key} is denied: Legal key list is {",".join(SECURE_STORAGE_ILLEGAL_ACCESS_KEY_LIST)}")
 
+    # Every keyring access is an IPC call to the OS keychain, so
+    # `_get_password`, `_set_password` and `_delete_password` keep
+    # `_keyring_cache` in sync with the keyring (write-through) and
+    # the keyring is only read once per key.
+
     def _get_password(self, key: SecureStorageKey) -> SecureStorageKeyValue | None:
         self._is_key_valid(key)
-        return self._parse_key_value_dict(keyring.get_password(APP_NAME, key) or "") or None
+        if key not in self._keyring_cache:
+            serialized_key_value = keyring.get_password(APP_NAME, key) or ""
+            key_value = self._parse_key_value_dict(serialized_key_value) or None
+            self._keyring_cache[key] = (serialized_key_value, key_value) if key_value else None
+
+        cached = self._keyring_cache[key]
+        return cached[1].copy() if cached else None
 
     def _set_password(self, key: SecureStorageKey, value: SecureStorageKeyValue) -> None:
         self._is_key_valid(key)
-        keyring.set_password(APP_NAME, key, self._serialize_key_value_dict(value))
+        serialized_key_value = self._serialize_key_value_dict(value)
+        cached = self._keyring_cache.get(key)
+        if cached and cached[0] == serialized_key_value:
+            return
+
+        keyring.set_password(APP_NAME, key, serialized_key_value)
+        self._keyring_cache[key] = (serialized_key_value, value.copy())
 
     def _delete_password(self, key: SecureStorageKey) -> None:
         try:
@@ -167,6 +237,7 @@ class SecureStorage:
         except keyring.errors.PasswordDeleteError:
             print(f"`{key}` could not found in keyring to delete. Skipping...")
             pass
+        self._keyring_cache[key] = None
 
     def _create_backup_id(self) -> str:
         return f"backup_id_{generate_random_id()}"
@@ -175,14 +246,14 @@ class SecureStorage:
         # Check out `_load_backup` method to see the structure
         # of the `SecureStorageKey.Backups`
         backups = self._get_password(SecureStorageKey.Backups)
-        if backups and len(backups["value"]) + 1 > MAX_BACKUP_COUNT:
-            backups["value"] = sorted(backups["value"], key=lambda x: x["backup_created_at"])[1:]
+        if backups and len(backups.value) + 1 > MAX_BACKUP_COUNT:
+            backups.value = sorted(backups.value, key=lambda x: x["backup_created_at"])[1:]
 
         backup_id = self._create_backup_id()
         self._set_password(
             SecureStorageKey.Backups,
             SecureStorageKeyValue(
-                value=(backups["value"] if backups else []) + [
+                value=(backups.value if backups else []) + [
                     {
                         "backup_id": backup_id,
                         "backup_data": [
@@ -195,7 +266,7 @@ class SecureStorage:
                     }
                 ],
                 type=SecureStorageKeyValueType.Plain,
-                created_at=backups["created_at"] if backups else time.time(),
+                created_at=backups.created_at if backups else time.time(),
                 last_updated_at=time.time()
             )
         )
@@ -232,14 +303,18 @@ class SecureStorage:
         if not backups:
             raise Exception("Error: There are no any backup saved.")
 
-        backups = backups["value"]
+        backups = backups.value
         backup_found = False
         for backup in backups:
             if backup["backup_id"] == backup_id:
                 backup_found = True
                 self.destroy()
                 for data in backup["backup_data"]:
-                    self._set_password(data["key_name"], data["key_value"])
+                    if data["key_value"]:
+                        self._set_password(
+                            data["key_name"],
+                            SecureStorageKeyValue(**data["key_value"])
+                        )
                 break
 
         if not backup_found:
@@ -256,9 +331,9 @@ class SecureStorage:
         self._set_password(
             SecureStorageKey.Backups,
             SecureStorageKeyValue(
-                value=[backup for backup in backups["value"] if backup["backup_id"] != backup_id],
+                value=[backup for backup in backups.value if backup["backup_id"] != backup_id],
                 type=SecureStorageKeyValueType.Plain,
-                created_at=backups["created_at"],
+                created_at=backups.created_at,
                 last_updated_at=time.time()
             )
         )
@@ -270,15 +345,15 @@ class SecureStorage:
 
     def _delete_all_backups_except_last_one(self) -> None:
         backups = self._get_password(SecureStorageKey.Backups)
-        if not backups or len(backups["value"]) < 2:
+        if not backups or len(backups.value) < 2:
             return
 
         self._set_password(
             SecureStorageKey.Backups,
             SecureStorageKeyValue(
-                value=backups["value"][1:],
+                value=backups.value[1:],
                 type=SecureStorageKeyValueType.Plain,
-                created_at=backups["created_at"],
+                created_at=backups.created_at,
                 last_updated_at=time.time()
             )
         )
@@ -290,10 +365,10 @@ class SecureStorage:
         if not key:
             key = self._create_key_value_dict(os.urandom(32).hex(), SecureStorageKeyValueType.Plain)
             self._set_password(SecureStorageKey.AESGCMCipherKey, key)
-            self._encryptor = AESGCMCipher(bytes.fromhex(key["value"]))
+            self._encryptor = AESGCMCipher(bytearray.fromhex(key.value))
         else:
-            self._encryptor = AESGCMCipher(bytes.fromhex(key["value"]))
-            if key["last_updated_at"] + ROTATE_KEY_TTL < time.time():
+            self._encryptor = AESGCMCipher(bytearray.fromhex(key.value))
+            if key.last_updated_at + ROTATE_KEY_TTL < time.time():
                 self._rotate_aesgcm_cipher()
 
     def _rotate_aesgcm_cipher(self) -> tuple[bool, bool]:
@@ -317,7 +392,7 @@ class SecureStorage:
             self._delete_password(SecureStorageKey.AESGCMCipherKey)
             self._init_aesgcm_cipher()
             for key_name, key_value in temp_store.items():
-                self.update_key(key_name, key_value["value"], key_value["type"], keep_last_update_at_same=True)
+                self.update_key(key_name, key_value.value, key_value.type, keep_last_update_at_same=True)
 
             print("AESGCM cipher rotation completed successfully.")
         except Exception as e:
@@ -343,7 +418,7 @@ class SecureStorage:
             if not aesgcm_cipher_key:
                 raise AESGCMCipherNotInitializedError(f"{SecureStorageKey.AESGCMCipherKey} not initialized properly after loading backup.")
 
-            aesgcm_cipher_key["last_updated_at"] = time.time() - ROTATE_FAILURE_TTL
+            aesgcm_cipher_key.last_updated_at = time.time() - ROTATE_FAILURE_TTL
             self._set_password(SecureStorageKey.AESGCMCipherKey, aesgcm_cipher_key)
             self._init_aesgcm_cipher()
             print("AESGCM cipher restored succesfully.")
@@ -360,6 +435,19 @@ class SecureStorage:
         private_pem = self._get_password(SecureStorageKey.PrivatePem)
         public_pem = self._get_password(SecureStorageKey.PublicPem)
         if not private_pem or not public_pem:
+            # Generating a key pair takes hundreds of milliseconds, so it is
+            # done in the background and `get_key_value` waits for it only
+            # when one of the pems is requested.
+            self._rsa_cipher_ready.clear()
+            threading.Thread(target=self._generate_rsa_cipher, daemon=True).start()
+        else:
+            if private_pem.last_updated_at + ROTATE_KEY_TTL < time.time():
+                self._rotate_rsa_cipher()
+            elif public_pem.last_updated_at + ROTATE_KEY_TTL < time.time():
+                self._rotate_rsa_cipher()
+
+    def _generate_rsa_cipher(self) -> None:
+        try:
             rsa_cipher = RSACipher()
             self.add_key(
                 SecureStorageKey.PrivatePem,
@@ -371,51 +459,50 @@ class SecureStorage:
                 rsa_cipher.get_public_pem(),
                 SecureStorageKeyValueType.AESGCMEncrypted
             )
-        else:
-            if private_pem["last_updated_at"] + ROTATE_KEY_TTL < time.time():
-                self._rotate_rsa_cipher()
-            elif public_pem["last_updated_at"] + ROTATE_KEY_TTL < time.time():
-                self._rotate_rsa_cipher()
+        except Exception as e:
+            print(f"RSA cipher could not be generated: `{str(e)}`")
+        finally:
+            self._rsa_cipher_ready.set()
 
     def _rotate_rsa_cipher(self) -> tuple[bool, bool]:
         def decrypt_rsa_encrypted_key(key_name: str) -> SecureStorageKeyValue | None:
-            if not private_pem:
+            if not private_key:
                 raise NoPrivatePemFoundError
             if key_name == SecureStorageKey.PublicPem or key_name == SecureStorageKey.PrivatePem:
                 return None
             key_value = self.get_key_value(cast(SecureStorageKey, key_name), use_cache=False)
-            if key_value and "value" in key_value and key_value["value"]:
+            if key_value and key_value.value:
                 if key_name == SecureStorageKey.Accounts:
-                    key_value["value"] = json.loads(key_value["value"].replace("'", "\""))
-                    for account in key_value["value"]:
-                        account["encrypted_password"] = RSACipher.decrypt_password(
+                    key_value.value = orjson.loads(key_value.value.replace("'", "\""))
+                    for account in key_value.value:
+                        account["encrypted_password"] = RSACipher.decrypt_with_key(
                             account["encrypted_password"],
-                            private_pem["value"]
+                            private_key
                         )
                 elif key_name == SecureStorageKey.TestKey:
-                    key_value["value"] = RSACipher.decrypt_password(
-                        key_value["value"],
-                        private_pem["value"]
+                    key_value.value = RSACipher.decrypt_with_key(
+                        key_value.value,
+                        private_key
                     )
 
             return key_value
 
-        def encrypt_rsa_decrypted_key(key_name: str, key_value: Any) -> SecureStorageKeyValue | None:
-            if not public_pem:
+        def encrypt_rsa_decrypted_key(key_name: str, key_value: SecureStorageKeyValue | None) -> SecureStorageKeyValue | None:
+            if not public_key:
                 raise NoPublicPemFoundError
             if key_name == SecureStorageKey.PublicPem or key_name == SecureStorageKey.PrivatePem:
                 return None
-            if key_value and "value" in key_value and key_value["value"]:
+            if key_value and key_value.value:
                 if key_name == SecureStorageKey.Accounts:
-                    for account in key_value["value"]:
-                        account["encrypted_password"] = RSACipher.encrypt_password(
+                    for account in key_value.value:
+                        account["encrypted_password"] = RSACipher.encrypt_with_key(
                             account["encrypted_password"],
-                            public_pem["value"]
+                            public_key
                         )
                 elif key_name == SecureStorageKey.TestKey:
-                    key_value["value"] = RSACipher.encrypt_password(
-                        key_value["value"],
-                        public_pem["value"]
+                    key_value.value = RSACipher.encrypt_with_key(
+                        key_value.value,
+                        public_key
                     )
 
             return key_value
@@ -428,7 +515,15 @@ class SecureStorage:
         pre_rsa_rotation_backup = self._create_backup()
 
         temp_store = {}
+        # Pems are parsed once for the whole rotation instead of once per
+        # encrypted value.
         private_pem = self.get_key_value(SecureStorageKey.PrivatePem, use_cache=False)
+        private_key = None
+        public_key = None
+        try:
+            private_key = RSACipher.load_private_key(private_pem.value) if private_pem else None
+        except Exception as e:
+            print(f"`{SecureStorageKey.PrivatePem}` could not be loaded: `{str(e)}`")
         for key_name in SECURE_STORAGE_KEY_LIST:
             try:
                 temp_store[key_name] = decrypt_rsa_encrypted_key(key_name)
@@ -442,13 +537,14 @@ class SecureStorage:
             self._init_rsa_cipher()
 
             public_pem = self.get_key_value(SecureStorageKey.PublicPem, use_cache=False)
+            public_key = RSACipher.load_public_key(public_pem.value) if public_pem else None
             for key_name, key_value in temp_store.items():
                 key_value = encrypt_rsa_decrypted_key(key_name, key_value)
                 if key_value:
                     self.update_key(
                         key_name,
-                        key_value["value"],
-                        key_value["type"],
+                        key_value.value,
+                        key_value.type,
                         keep_last_update_at_same=True
                     )
 
@@ -476,11 +572,11 @@ class SecureStorage:
             private_pem = self.get_key_value(SecureStorageKey.PrivatePem)
             if not private_pem:
                 raise NoPrivatePemFoundError(f"{SecureStorageKey.PrivatePem} not initialized properly after loading backup")
-            private_pem["last_updated_at"] = time.time() - ROTATE_FAILURE_TTL
+            private_pem.last_updated_at = time.time() - ROTATE_FAILURE_TTL
             self.update_key(
                 SecureStorageKey.PrivatePem,
-                private_pem["value"],
-                private_pem["type"],
+                private_pem.value,
+                private_pem.type,
                 keep_last_update_at_same=True
             )
 
@@ -488,11 +584,11 @@ class SecureStorage:
             public_pem = self.get_key_value(SecureStorageKey.PublicPem)
             if not public_pem:
                 raise NoPublicPemFoundError(f"{SecureStorageKey.PublicPem} not initialized properly after loading backup")
-            public_pem["last_updated_at"] = time.time() - ROTATE_FAILURE_TTL
+            public_pem.last_updated_at = time.time() - ROTATE_FAILURE_TTL
             self.update_key(
                 SecureStorageKey.PublicPem,
-                public_pem["value"],
-                public_pem["type"],
+                public_pem.value,
+                public_pem.type,
                 keep_last_update_at_same=True
             )
             print("RSA cipher restored succesfully.")
@@ -514,6 +610,9 @@ class SecureStorage:
         self._is_key_valid(key_name)
         self._is_key_legal(key_name)
 
+        if key_name == SecureStorageKey.PublicPem or key_name == SecureStorageKey.PrivatePem:
+            self._rsa_cipher_ready.wait()
+
         key_value = self._cache.get(key_name) if use_cache else None
         if not key_value:
             key_value = self._get_password(key_name)
@@ -522,11 +621,34 @@ class SecureStorage:
             if use_cache:
                 self._cache.set(key_name, key_value)
 
-        if decrypt and key_value["type"] == SecureStorageKeyValueType.AESGCMEncrypted:
-            key_value["value"] = self._encryptor.decrypt(key_value["value"], associated_data)
+        if decrypt and key_value.type == SecureStorageKeyValueType.AESGCMEncrypted:
+            key_value.value = self._decrypt(key_name, key_value.value, associated_data, use_cache)
 
         return key_value
 
+    def _decrypt(self,
+        key_name: SecureStorageKey,
+        encrypted_value: str,
+        associated_data: bytes | None,
+        use_cache: bool
+    ) -> str:
+        # Decrypted values are kept with their encrypted value, so an
+        # entry can never be returned for a value that has changed since.
+        plain_cache_key = (key_name, associated_data)
+        if use_cache and CACHE_DECRYPTED_VALUES:
+            cached = self._plain_cache.get(plain_cache_key)
+            if cached and cached[0] == encrypted_value and time.time() - cached[2] <= CACHE_TTL:
+                return cached[1]
+
+        value = self._encryptor.decrypt(encrypted_value, associated_data)
+        if CACHE_DECRYPTED_VALUES:
+            self._plain_cache[plain_cache_key] = (encrypted_value, value, time.time())
+        return value
+
+    def _invalidate_decrypted_value(self, key_name: SecureStorageKey) -> None:
+        for plain_cache_key in [k for k in self._plain_cache if k[0] == key_name]:
+            del self._plain_cache[plain_cache_key]
+
     def add_key(self,
         key_name: SecureStorageKey,
         value: Any,
@@ -540,10 +662,14 @@ class SecureStorage:
 
         key_value = self._create_key_value_dict(value, key_value_type)
         if key_value_type == SecureStorageKeyValueType.AESGCMEncrypted:
-            key_value["value"] = self._encryptor.encrypt(key_value["value"], associated_data)
+            key_value.value = self._encryptor.encrypt(
+                self._coerce_to_str(key_value.value),
+                associated_data
+            )
 
         self._set_password(key_name, key_value)
         self._cache.set(key_name, key_value)
+        self._invalidate_decrypted_value(key_name)
 
     def update_key(self,
         key_name: SecureStorageKey,
@@ -560,29 +686,37 @@ class SecureStorage:
         created_at = time.time()
         last_updated_at = time.time()
         if key_value:
-            created_at, last_updated_at = key_value["created_at"], key_value["last_updated_at"]
-            self.delete_key(key_name)
+            # No need to delete the key first, `_set_password`
+            # overwrites the existing value.
+            created_at, last_updated_at = key_value.created_at, key_value.last_updated_at
 
         key_value = self._create_key_value_dict(value, key_value_type)
-        key_value["created_at"] = created_at
-        key_value["last_updated_at"] = last_updated_at
+        key_value.created_at = created_at
+        key_value.last_updated_at = last_updated_at
 
         if not keep_last_update_at_same:
-            key_value["last_updated_at"] = time.time()
+            key_value.last_updated_at = time.time()
 
         if key_value_type == SecureStorageKeyValueType.AESGCMEncrypted:
-            key_value["value"] = self._encryptor.encrypt(key_value["value"], associated_data)
+            key_value.value = self._encryptor.encrypt(
+                self._coerce_to_str(key_value.value),
+                associated_data
+            )
 
         self._set_password(key_name, key_value)
         self._cache.set(key_name, key_value)
+        self._invalidate_decrypted_value(key_name)
 
     def delete_key(self, key_name: SecureStorageKey) -> None:
         self._is_key_legal(key_name)
         self._delete_password(key_name)
         self._cache.delete(key_name)
+        self._invalidate_decrypted_value(key_name)
 
     def clear(self) -> None:
         self._cache.destroy()
+        self._plain_cache.clear()
+        RSACipher.clear_key_cache()
 
     def destroy(self, /, destroy_backup: bool = False) -> None:
         if self._cache:
@@ -595,7 +729,8 @@ class SecureStorage:
 
 
 class SecureStorageCache:
-    class CachedData(TypedDict):
+    @dataclass(slots=True)
+    class CachedData:
         data: SecureStorageKeyValue
         created_at: float
 
@@ -609,9 +744,6 @@ class SecureStorageCache:
 
         return cls._instance
 
-    def __del__(self):
-        self.destroy()
-
     def _is_expired(self, timestamp: float) -> bool:
         return time.time() - timestamp > CACHE_TTL
 
@@ -620,23 +752,24 @@ class SecureStorageCache:
             return None
 
         store_data: SecureStorageCache.CachedData = self._store[key]
-        if self._is_expired(store_data["created_at"]):
+        if self._is_expired(store_data.created_at):
             self.delete(key)
             return None
 
-        return copy.deepcopy(store_data["data"])
+        # Values are flat records of scalars (see `SecureStorageKeyValue`)
+        # so a shallow copy is enough to keep the cached data untouched.
+        return store_data.data.copy()
 
     def set(self, key: SecureStorageKey, value: SecureStorageKeyValue):
-        self._store[key] = {
-            "data": copy.deepcopy(value),
-            "created_at": time.time()
-        }
+        self._store[key] = SecureStorageCache.CachedData(
+            data=value.copy(),
+            created_at=time.time()
+        )
 
     def delete(self, key: SecureStorageKey):
-        if key in self._store:
-            random_bytes = os.urandom(len(str(self._store[key])))
-            self._store[key] = random_bytes.hex() # type: ignore
-            del self._store[key]
+        # Overwriting the entry would not scrub the immutable str values
+        # anyway, so it is just dropped.
+        self._store.pop(key, None)
 
     def destroy(self):
         for key in list(self._store.keys()):
@@ -644,33 +777,89 @@ class SecureStorageCache:
 
         self._store = {}
 
+@functools.cache
+def has_aes_instructions() -> bool:
+    """
+    Check if the CPU has AES instructions (AES-NI on x86, ARMv8 crypto
+    extensions on ARM). Only linux exposes them in a cheap way, other
+    platforms are assumed to have them, every x86 mac and apple silicon
+    does.
+    """
+    if not sys.platform.startswith("linux"):
+        return True
+
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith(("flags", "Features")) and "aes" in line.split():
+                    return True
+        return False
+    except OSError:
+        return True
+
 class AESGCMCipher:
-    def __init__(self, key: bytes):
+    def __init__(self, key: bytes | bytearray):
         if len(key) not in [16, 24, 32]:
             raise ValueError("Key length must be 16, 24, or 32 bytes.")
 
         try:
-            self._cipher = AESGCM(key)
+            # Key schedule is created once and reused by every
+            # encryption/decryption.
+            self._algorithm = algorithms.AES(bytes(key))
+            # Without AES instructions AES-GCM falls back to a much slower
+            # software implementation, so new values are encrypted with
+            # ChaCha20-Poly1305 instead (it needs a 256-bit key).
+            self._chacha = (
+                ChaCha20Poly1305(bytes(key))
+                if len(key) == 32 and not has_aes_instructions()
+                else None
+            )
         finally:
-            random_bytes = os.urandom(len(str(key)))
-            key = random_bytes.hex()
+            # Only a mutable buffer can be scrubbed in place.
+            if isinstance(key, bytearray):
+                key[:] = bytes(len(key))
 
     def encrypt(self, plain_text: str, associated_data: bytes | None = None) -> str:
-        if not isinstance(plain_text, str):
-            plain_text = json.dumps(plain_text)
-
-        nonce = os.urandom(12)
-        cipher_text = self._cipher.encrypt(nonce, plain_text.encode(), associated_data)
-        return base64.b64encode(nonce + cipher_text).decode('utf-8')
+        nonce = os.urandom(AESGCM_NONCE_SIZE)
+        if self._chacha:
+            cipher_text = self._chacha.encrypt(nonce, plain_text.encode(), associated_data)
+            return CHACHA20_PREFIX + base64.b64encode(nonce + cipher_text).decode('utf-8')
+
+        encryptor = Cipher(self._algorithm, modes.GCM(nonce)).encryptor()
+        if associated_data:
+            encryptor.authenticate_additional_data(associated_data)
+
+        # Same layout as `AESGCM.encrypt`: nonce + cipher_text + tag,
+        # written into a single buffer instead of concatenating the parts.
+        data = plain_text.encode()
+        buffer = bytearray(AESGCM_NONCE_SIZE + len(data) + AESGCM_TAG_SIZE)
+        view = memoryview(buffer)
+        view[:AESGCM_NONCE_SIZE] = nonce
+        # GCM is a stream mode, so `update_into` writes exactly len(data)
+        # bytes, tag size leaves the `block_size - 1` room it requires.
+        written = AESGCM_NONCE_SIZE + encryptor.update_into(data, view[AESGCM_NONCE_SIZE:])
+        encryptor.finalize()
+        view[written:written + AESGCM_TAG_SIZE] = encryptor.tag
+        return base64.b64encode(buffer).decode('utf-8')
 
     def decrypt(self, encrypted_text: str, associated_data: bytes | None = None) -> str:
-        if not isinstance(encrypted_text, str):
-            encrypted_text = json.dumps(encrypted_text)
-
-        encrypted_text = base64.b64decode(encrypted_text)
-        nonce = encrypted_text[:12]
-        cipher_text = encrypted_text[12:]
-        return self._cipher.decrypt(nonce, cipher_text, associated_data).decode('utf-8')
+        if encrypted_text.startswith(CHACHA20_PREFIX):
+            data = base64.b64decode(encrypted_text[len(CHACHA20_PREFIX):])
+            nonce, cipher_text = data[:AESGCM_NONCE_SIZE], data[AESGCM_NONCE_SIZE:]
+            # Values may be moved between machines with backups, so they
+            # are decrypted even if AES-GCM is preferred on this one.
+            chacha = self._chacha or ChaCha20Poly1305(self._algorithm.key)
+            return chacha.decrypt(nonce, cipher_text, associated_data).decode('utf-8')
+
+        # Slicing a view doesn't copy the (possibly large) cipher text.
+        view = memoryview(base64.b64decode(encrypted_text))
+        nonce = bytes(view[:AESGCM_NONCE_SIZE])
+        cipher_text = view[AESGCM_NONCE_SIZE:-AESGCM_TAG_SIZE]
+        tag = bytes(view[-AESGCM_TAG_SIZE:])
+        decryptor = Cipher(self._algorithm, modes.GCM(nonce, tag)).decryptor()
+        if associated_data:
+            decryptor.authenticate_additional_data(associated_data)
+        return (decryptor.update(cipher_text) + decryptor.finalize()).decode('utf-8')
 
 class RSACipher:
     def __init__(self):
@@ -704,48 +893,97 @@ class RSACipher:
     def get_private_pem(self) -> str:
         return self._private_pem.decode("utf-8") if isinstance(self._private_pem, bytes) else self._private_pem
 
+    # Pems are parsed (ASN.1/DER decoding) on every encrypt/decrypt
+    # call otherwise, while the same pem is used almost every time.
     @staticmethod
-    def encrypt_password(
-        plain_text_password: str,
-        public_pem: str | bytes
-    ) -> str:
+    @functools.lru_cache(maxsize=PEM_CACHE_SIZE)
+    def _load_public_key(public_pem: bytes) -> rsa.RSAPublicKey:
+        return cast(rsa.RSAPublicKey, serialization.load_pem_public_key(public_pem))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=PEM_CACHE_SIZE)
+    def _load_private_key(private_pem: bytes) -> rsa.RSAPrivateKey:
+        return cast(rsa.RSAPrivateKey, serialization.load_pem_private_key(private_pem, password=None))
+
+    @staticmethod
+    def clear_key_cache() -> None:
+        RSACipher._load_public_key.cache_clear()
+        RSACipher._load_private_key.cache_clear()
+
+    @staticmethod
+    def load_public_key(public_pem: str | bytes) -> rsa.RSAPublicKey:
         if isinstance(public_pem, str):
             public_pem = public_pem.encode('utf-8')
 
-        if not isinstance(plain_text_password, str):
-            plain_text_password = json.dumps(plain_text_password)
+        return RSACipher._load_public_key(public_pem)
 
-        public_key = serialization.load_pem_public_key(public_pem)
-        encrypted_b64_password = public_key.encrypt(
-            plain_text_password.encode("utf-8"),
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
-        return base64.b64encode(encrypted_b64_password).decode("utf-8")
+    @staticmethod
+    def load_private_key(private_pem: str | bytes) -> rsa.RSAPrivateKey:
+        if isinstance(private_pem, str):
+            private_pem = private_pem.encode('utf-8')
+
+        return RSACipher._load_private_key(private_pem)
+
+    @staticmethod
+    def encrypt_password(
+        plain_text_password: str,
+        public_pem: str | bytes
+    ) -> str:
+        return RSACipher.encrypt_with_key(plain_text_password, RSACipher.load_public_key(public_pem))
 
     @staticmethod
     def decrypt_password(
         encrypted_b64_password: str,
         private_pem: str | bytes
     ) -> str:
-        if isinstance(private_pem, str):
-            private_pem = private_pem.encode('utf-8')
-
-        if not isinstance(encrypted_b64_password, str):
-            encrypted_b64_password = json.dumps(encrypted_b64_password)
+        return RSACipher.decrypt_with_key(encrypted_b64_password, RSACipher.load_private_key(private_pem))
 
-        private_key = serialization.load_pem_private_key(private_pem, password=None)
-        return private_key.decrypt(
-            base64.b64decode(encrypted_b64_password),
+    @staticmethod
+    def encrypt_with_key(
+        plain_text_password: str,
+        public_key: rsa.RSAPublicKey
+    ) -> str:
+        # RSA-OAEP can only encrypt up to 190 bytes with a 2048-bit key,
+        # so the value is encrypted with a one-time AES-GCM key and only
+        # that key is encrypted with RSA.
+        # Layout: len(wrapped_key) (2 bytes) + wrapped_key + nonce + cipher_text
+        data_key = AESGCM.generate_key(bit_length=256)
+        nonce = os.urandom(12)
+        cipher_text = AESGCM(data_key).encrypt(nonce, plain_text_password.encode("utf-8"), None)
+        wrapped_key = public_key.encrypt(
+            data_key,
             padding.OAEP(
                 mgf=padding.MGF1(algorithm=hashes.SHA256()),
                 algorithm=hashes.SHA256(),
                 label=None
             )
-        ).decode("utf-8")
+        )
+        envelope = len(wrapped_key).to_bytes(2, "big") + wrapped_key + nonce + cipher_text
+        return RSA_ENVELOPE_PREFIX + base64.b64encode(envelope).decode("utf-8")
+
+    @staticmethod
+    def decrypt_with_key(
+        encrypted_b64_password: str,
+        private_key: rsa.RSAPrivateKey
+    ) -> str:
+        oaep_padding = padding.OAEP(
+            mgf=padding.MGF1(algorithm=hashes.SHA256()),
+            algorithm=hashes.SHA256(),
+            label=None
+        )
+        if not encrypted_b64_password.startswith(RSA_ENVELOPE_PREFIX):
+            # Plain RSA-OAEP, see `RSAEncryptor` of the client.
+            return private_key.decrypt(
+                base64.b64decode(encrypted_b64_password),
+                oaep_padding
+            ).decode("utf-8")
+
+        envelope = base64.b64decode(encrypted_b64_password[len(RSA_ENVELOPE_PREFIX):])
+        wrapped_key_end = 2 + int.from_bytes(envelope[:2], "big")
+        data_key = private_key.decrypt(envelope[2:wrapped_key_end], oaep_padding)
+        nonce = envelope[wrapped_key_end:wrapped_key_end + 12]
+        cipher_text = envelope[wrapped_key_end + 12:]
+        return AESGCM(data_key).decrypt(nonce, cipher_text, None).decode("utf-8")
 
 __all__ = [
     "SecureStorage",
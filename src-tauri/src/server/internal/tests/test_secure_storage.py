@@ -1,5 +1,8 @@
+import os
 import time
+import base64
 import unittest
+from unittest.mock import patch
 import json
 from typing import cast
 
@@ -7,6 +10,11 @@ from classes.tests.utils.name_generator import NameGenerator
 from classes.secure_storage import *
 from classes.secure_storage import SECURE_STORAGE_ILLEGAL_ACCESS_KEY_LIST
 from classes.secure_storage import SECURE_STORAGE_KEY_LIST
+from classes.secure_storage import RSA_ENVELOPE_PREFIX
+from classes.secure_storage import CHACHA20_PREFIX
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives import hashes
 
 class TestSecureStorage(unittest.TestCase):
     @classmethod
@@ -360,6 +368,103 @@ class TestSecureStorage(unittest.TestCase):
 
         self.check_cache()
 
+    def test_chacha20_encryption_decryption(self):
+        print("test_chacha20_encryption_decryption...")
+        # ChaCha20-Poly1305 is preferred on CPUs without AES instructions.
+        with patch("classes.secure_storage.has_aes_instructions", return_value=False):
+            cipher = AESGCMCipher(os.urandom(32))
+
+        original_value = cast(str, NameGenerator.email_address()[0])
+        encrypted_value = cipher.encrypt(original_value, b"associated_data")
+        self.assertTrue(encrypted_value.startswith(CHACHA20_PREFIX))
+        self.assertEqual(original_value, cipher.decrypt(encrypted_value, b"associated_data"))
+
+    def test_chacha20_decryption_with_aes_instructions(self):
+        print("test_chacha20_decryption_with_aes_instructions...")
+        # Values encrypted on a machine without AES instructions (moved
+        # with a backup) must still be decrypted where AES-GCM is preferred.
+        key = os.urandom(32)
+        original_value = cast(str, NameGenerator.email_address()[0])
+        nonce = os.urandom(12)
+        encrypted_value = CHACHA20_PREFIX + base64.b64encode(
+            nonce + ChaCha20Poly1305(key).encrypt(nonce, original_value.encode(), b"associated_data")
+        ).decode("utf-8")
+
+        with patch("classes.secure_storage.has_aes_instructions", return_value=True):
+            cipher = AESGCMCipher(key)
+
+        self.assertEqual(original_value, cipher.decrypt(encrypted_value, b"associated_data"))
+
+    def test_aesgcm_legacy_encryption_decryption(self):
+        print("test_aesgcm_legacy_encryption_decryption...")
+        # Values stored before the `Cipher`/`update_into` rewrite are
+        # plain `AESGCM` outputs: nonce + cipher_text + tag, no prefix.
+        key = os.urandom(32)
+        original_value = cast(str, NameGenerator.email_address()[0])
+        nonce = os.urandom(12)
+        encrypted_value = base64.b64encode(
+            nonce + AESGCM(key).encrypt(nonce, original_value.encode(), b"associated_data")
+        ).decode("utf-8")
+
+        with patch("classes.secure_storage.has_aes_instructions", return_value=True):
+            cipher = AESGCMCipher(key)
+
+        self.assertEqual(original_value, cipher.decrypt(encrypted_value, b"associated_data"))
+
+        # And the other way around, new values keep the same layout.
+        encrypted_value = base64.b64decode(cipher.encrypt(original_value, b"associated_data"))
+        self.assertEqual(
+            original_value,
+            AESGCM(key).decrypt(encrypted_value[:12], encrypted_value[12:], b"associated_data").decode("utf-8")
+        )
+
+    def test_rsa_envelope_encryption_decryption(self):
+        print("test_rsa_envelope_encryption_decryption...")
+        rsa_cipher = RSACipher()
+
+        original_value = cast(str, NameGenerator.email_address()[0])
+        encrypted_value = RSACipher.encrypt_password(original_value, rsa_cipher.get_public_pem())
+        self.assertTrue(encrypted_value.startswith(RSA_ENVELOPE_PREFIX))
+        self.assertEqual(
+            original_value,
+            RSACipher.decrypt_password(encrypted_value, rsa_cipher.get_private_pem())
+        )
+
+    def test_rsa_plain_oaep_decryption(self):
+        print("test_rsa_plain_oaep_decryption...")
+        rsa_cipher = RSACipher()
+
+        # Same as `RSAEncryptor` of the client, plain RSA-OAEP
+        # without the envelope.
+        original_value = cast(str, NameGenerator.email_address()[0])
+        encrypted_value = base64.b64encode(
+            RSACipher.load_public_key(rsa_cipher.get_public_pem()).encrypt(
+                original_value.encode("utf-8"),
+                padding.OAEP(
+                    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+                    algorithm=hashes.SHA256(),
+                    label=None
+                )
+            )
+        ).decode("utf-8")
+        self.assertEqual(
+            original_value,
+            RSACipher.decrypt_password(encrypted_value, rsa_cipher.get_private_pem())
+        )
+
+    def test_rsa_envelope_long_value(self):
+        print("test_rsa_envelope_long_value...")
+        rsa_cipher = RSACipher()
+
+        # RSA-OAEP alone can encrypt at most 190 bytes with a 2048-bit key.
+        original_value = ",".join(NameGenerator.email_address(count=20, all_different=True))
+        self.assertGreater(len(original_value.encode("utf-8")), 190)
+        encrypted_value = RSACipher.encrypt_password(original_value, rsa_cipher.get_public_pem())
+        self.assertEqual(
+            original_value,
+            RSACipher.decrypt_password(encrypted_value, rsa_cipher.get_private_pem())
+        )
+
     def test_update_key(self):
         print("test_update_key...")
         test_key_value = {
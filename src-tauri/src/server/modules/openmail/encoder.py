@@ -2,7 +2,7 @@ import os
 import base64
 import mimetypes
 import urllib.request
-from typing import Generator
+from typing import Generator, Iterable
 
 """
 Constants
@@ -44,6 +44,34 @@ def calculate_chunk_size(total_size_in_bytes: int) -> int:
         scale = (total_size_in_bytes - threshold_small) / (threshold_large - threshold_small)
         return int(min_chunk + scale * (max_chunk - min_chunk))
 
+def encode_base64_chunks(chunks: Iterable[bytes]) -> str:
+    """
+    Base64-encode the given byte chunks one by one instead of joining
+    them into a single buffer first. Leftover bytes of a chunk that is
+    not a multiple of 3 are carried over to the next chunk, so the
+    result is identical to encoding the joined data at once.
+
+    Args:
+        chunks (Iterable[bytes]): Byte chunks to encode, can be a generator.
+
+    Returns:
+        str: The base64-encoded string of the concatenated chunks.
+
+    Example:
+        >>> encode_base64_chunks([b"Hello, ", b"world!"])
+        "SGVsbG8sIHdvcmxkIQ=="
+    """
+    encoded = bytearray()
+    remainder = b""
+    for chunk in chunks:
+        if remainder:
+            chunk = remainder + chunk
+        aligned_length = len(chunk) - len(chunk) % 3
+        encoded += base64.b64encode(chunk[:aligned_length])
+        remainder = chunk[aligned_length:]
+    encoded += base64.b64encode(remainder)
+    return encoded.decode("ascii")
+
 class FileBase64Encoder:
     """A static class for reading and encoding files to base64-encoded strings."""
 
@@ -93,7 +121,7 @@ class FileBase64Encoder:
 
             name = os.path.basename(file_path)
             mime_type = response.info().get_content_type() or DEFAULT_FALLBACK_MIMETYPE
-            base64_data = base64.b64encode(b''.join(chunks)).decode('utf-8')
+            base64_data = encode_base64_chunks(chunks)
             return name, mime_type, size, base64_data
 
     @staticmethod
@@ -158,7 +186,7 @@ class FileBase64Encoder:
         size = os.path.getsize(file_path)
         chunk_size = calculate_chunk_size(size)
         mime_type = mimetypes.guess_type(file_path)[0] or DEFAULT_FALLBACK_MIMETYPE
-        base64_data = base64.b64encode(b''.join(file_to_base64_streaming(file_path, fetch_size))).decode('utf-8')
+        base64_data = encode_base64_chunks(file_to_base64_streaming(file_path, fetch_size))
         return name, mime_type, size, base64_data
 
     @staticmethod
@@ -17,17 +17,24 @@ Author: <berkaykayaforbusiness@outlook.com>
 """
 
 from email.message import EmailMessage
+from array import array
+import bisect
 import imaplib
+import io
+import logging
 import re
 import threading
 import time
+import zlib
+from collections import OrderedDict
 from zoneinfo import ZoneInfo
-from typing import Callable, override, List
+from contextlib import AbstractContextManager, contextmanager
+from typing import Callable, Iterable, Iterator, override, List
 from enum import Enum
 from ssl import SSLContext
 from types import MappingProxyType
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from email.utils import parsedate_to_datetime
 
 from .parser import MessageDecoder, MessageParser
@@ -41,6 +48,10 @@ from .utils import (
 from .utils import contains_non_ascii
 from .types import SearchCriteria, Attachment, Mailbox, Email, Flags, Mark, Folder
 
+# IDLE and readline traces are logged as debug, so nothing is
+# formatted unless debug logging is enabled.
+logger = logging.getLogger(__name__)
+
 """
 Exceptions
 """
@@ -70,24 +81,21 @@ IMAP_SERVERS = MappingProxyType(
 )
 IMAP_PORT = 993
 
-# Regex Patterns
-SEQUENCE_SET_PATTERN = re.compile(
-    r"""
-    ^(
-        (\d+(,|:))*\d+$ |
-        \*:((\d+(,|:))*\d+)?$ |
-        ((\d+(,|:))*\d+:)?\*$
-    )$
-""",
-    re.VERBOSE,
-)
-
 # Typo prevention
 CRLF = b"\r\n"
 INBOX = "INBOX"
 
-MARK_LIST = [str(m).lower() for m in Mark]
-FOLDER_LIST = [str(f).lower() for f in Folder]
+MARK_LIST = frozenset(str(m).lower() for m in Mark)
+# Ordered, use FOLDER_SET for membership checks.
+FOLDER_LIST = tuple(str(f).lower() for f in Folder)
+FOLDER_SET = frozenset(FOLDER_LIST)
+TAGGED_FOLDER_PREFIXES = tuple(f"{folder.capitalize()}:" for folder in FOLDER_LIST)
+# Translation table that removes the characters that can not be in a
+# folder name, LIST wildcards and the characters that break quoting.
+FOLDER_NAME_FORBIDDEN_CHARS = dict.fromkeys(map(ord, '\x00\r\n*%"\\'), None)
+NOSELECT_PATTERN = re.compile(rb"\\Noselect", re.IGNORECASE)
+# Unsolicited responses that are normally dropped by SELECT.
+SELECT_RESET_RESPONSES = ("EXPUNGE", "EXISTS", "RECENT", "FETCH")
 
 """
 Custom consts
@@ -95,6 +103,8 @@ Custom consts
 GET_EMAILS_OFFSET_START = 1
 GET_EMAILS_OFFSET_END = 10
 SHORT_BODY_TEXT_CHUNK_SIZE = 4096  # in bytes
+SPECULATIVE_BODY_PART = "1"
+READ_BUFFER_SIZE = 64 * 1024  # in bytes
 EMAIL_LOOKBACK_WINDOW = 5  # minutes
 # Character counts
 SHORT_BODY_MAX_LENGTH = 100
@@ -105,6 +115,37 @@ IDLE_TIMEOUT = 29 * 60
 JOIN_TIMEOUT = 1
 WAIT_RESPONSE_TIMEOUT = 30
 IDLE_ACTIVATION_INTERVAL = 60
+FOLDER_LIST_CACHE_TTL = 60
+# Number of emails
+EMAIL_CONTENT_CACHE_SIZE = 64
+# Number of sequence sets
+EMAIL_FLAGS_CACHE_SIZE = 16
+# Number of emails
+BODYSTRUCTURE_CACHE_SIZE = 256
+
+
+class _InflatingSocketReader(io.RawIOBase):
+    """Raw stream that inflates the data read from a socket that is
+    compressed with `COMPRESS DEFLATE`, see RFC 4978."""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = b""
+        while not data:
+            compressed = self._decompressor.unconsumed_tail
+            if not compressed:
+                compressed = self._sock.recv(READ_BUFFER_SIZE)
+                if not compressed:
+                    return 0
+            data = self._decompressor.decompress(compressed, len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
 
 
 class IMAPManager(imaplib.IMAP4_SSL):
@@ -145,7 +186,9 @@ class IMAPManager(imaplib.IMAP4_SSL):
     @dataclass
     class SearchedEmails:
         """Dataclass for storing searched emails."""
-        uids: List[str]
+        # Unsigned 32-bit ints (RFC 9051 uids are nz-number), much smaller
+        # than a list of str for big mailboxes.
+        uids: array[int]
         count: int
         folder: str
         search_query: str
@@ -171,9 +214,13 @@ class IMAPManager(imaplib.IMAP4_SSL):
         self._current_idle: IMAPManager.IdleSession | None = None
         self._idle_activation_countdown = 0
         self._is_idle_activation_countdown_continue = False
-        self._wait_response: IMAPManager.WaitResponse | None = None
+        self._response_events = {
+            wait_response: threading.Event()
+            for wait_response in IMAPManager.WaitResponse
+        }
         self._previous_mailbox_size = 0
         self._new_message_timestamps: List[datetime] = []
+        self._new_message_listeners: set[Callable[[], None]] = set()
         self._readline_event = threading.Event()
         self._readline_thread = threading.Thread(
             target=self._start_reading_lines, daemon=True
@@ -188,6 +235,11 @@ class IMAPManager(imaplib.IMAP4_SSL):
         self._release_idle_loops_event = threading.Event()
         self._idle_command_in_process_event = threading.Event()
         self._idle_command_in_process_event.set()
+        self._idle_pause_depth = threading.local()
+        self._compressor = None
+        # IDLE/DONE/NOOP are sent from the idle threads, compressed
+        # chunks must not interleave with the ones of other commands.
+        self._compressor_lock = threading.Lock()
 
         super().__init__(
             self._host,
@@ -197,8 +249,32 @@ class IMAPManager(imaplib.IMAP4_SSL):
         )
 
         self._is_idle_supported = self.is_supported("IDLE")
+        self._is_utf8_enabled = False
         self._searched_emails: IMAPManager.SearchedEmails | None = None
         self._hierarchy_delimiter = ""
+        # {(folder_name, tagged): (created_at, folders)}
+        self._folders_cache: dict[tuple[str | None, bool], tuple[float, List[str]]] = {}
+        # (created_at, [(uppercased_decoded_folder, folder_as_bytes), ...])
+        self._folder_list_cache: tuple[float, List[tuple[str, bytes]]] | None = None
+        # {(requested_folder, encoded): (created_at, matching_folder)}
+        self._folder_match_cache: dict[tuple[str, bool], tuple[float, bytes | str]] = {}
+        # {(raw_folder, tagged): extracted_folder_name}
+        self._extracted_folder_name_cache: dict[tuple[str | bytes, bool], str] = {}
+        # Last selected folder, its mode and its UIDVALIDITY
+        self._selected_folder: str | bytes | None = None
+        self._selected_readonly = False
+        self._selected_uidvalidity: bytes | None = None
+        # {(folder, uidvalidity, uid): email_without_flags}
+        self._email_content_cache: OrderedDict[tuple[str, bytes, str], Email] = OrderedDict()
+        # {(folder, uidvalidity, sequence_set): (modseq, {uid: flags})}
+        self._email_flags_cache: OrderedDict[
+            tuple[str | bytes, bytes, str], tuple[int, dict[str, List[str]]]
+        ] = OrderedDict()
+        # Per thread {selected_folder: [sequence_set]} whose expunge is
+        # deferred by `batch`, `pending` is None outside of `batch`.
+        self._batch_local = threading.local()
+        # {(folder, uidvalidity, uid): bodystructure_fetch_result}
+        self._bodystructure_cache: OrderedDict[tuple[str, bytes, str], list] = OrderedDict()
 
         self.login(email_address, password)
 
@@ -262,9 +338,6 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 - A boolean indicating success (True for "OK", False otherwise).
                 - The server's response message as a string.
 
-        Raises:
-            IMAPManagerException: If parsing the command result fails.
-
         Example:
             >>> result = ("OK", [b"Command completed successfully"])
             >>> self._parse_command_result(result,
@@ -290,41 +363,73 @@ class IMAPManager(imaplib.IMAP4_SSL):
             a logout command and will be searching for a "logout" in the
             result message like in the example.
         """
-        try:
-            if result[0] == "OK" or result[0] == "BYE":
-                return True, success_message or (result[1][0] or b"").decode("utf-8")
-            else:
-                return False, failure_message + ": " + (result[1][0] or b"").decode(
-                    "utf-8"
+        status, data = result
+        is_success = status == "OK" or status == "BYE"
+        if is_success and success_message:
+            # Server message is not needed, no need to decode it.
+            return True, success_message
+
+        message = data[0] if data else None
+        if isinstance(message, tuple):
+            # e.g. (b'1 (UID 1 BODY[1] {12}', b'Hello World!')
+            message = message[0]
+        message = message.decode("utf-8", errors="replace") if message else ""
+
+        if is_success:
+            return True, message
+        return False, failure_message + ": " + message
+
+    def _refresh_capabilities(self) -> None:
+        """Update `capabilities` with the ones advertised after login,
+        servers usually advertise more of them (e.g. MOVE, UIDPLUS) once
+        the client is authenticated. The capabilities sent with the login
+        response are used if there are any instead of asking for them again."""
+        # e.g. `A001 OK [CAPABILITY IMAP4rev1 ... UTF8=ACCEPT] Logged in`
+        capabilities = self.untagged_responses.pop("CAPABILITY", None)
+        if not capabilities:
+            capability_result = self.capability()
+            if capability_result[0] != "OK":
+                raise IMAPManagerException(
+                    f"Could not receive capability list: {capability_result[1]}"
                 )
-        except Exception as e:
-            raise IMAPManagerException(
-                f"There was an error while parsing command `{result}` result: {str(e)}"
-            ) from None
+            capabilities = capability_result[1]
 
-    def _enable_utf8(self) -> bool:
-        """Enable UTF8 if the server supports it. Does not raise any error
-        if not found. Typically used right after login."""
-        is_success = False
-        capability_result = self.capability()
-        if capability_result[0] != "OK":
-            raise IMAPManagerException(
-                f"Could not receive capability list to enable utf8: {capability_result[1]}"
-            )
+        self.capabilities = tuple(
+            b" ".join(capability for capability in capabilities if capability)
+            .decode("ascii", errors="replace")
+            .upper()
+            .split()
+        )
 
-        if [b"UTF8=ACCEPT" in capabilities for capabilities in capability_result[1]]:
-            utf8_enable_result = self._simple_command("ENABLE", "UTF8=ACCEPT")
-            is_success = utf8_enable_result[0] == "OK"
-            if not is_success:
-                print(f"Could not enable UTF-8: {utf8_enable_result[1]}")
+    def _is_utf8_supported(self) -> bool:
+        """Check if the server supports UTF8=ACCEPT."""
+        return self.is_supported("UTF8=ACCEPT")
 
-        return is_success
+    def _enable_utf8_and_set_hierarchy_delimiter(self) -> None:
+        """Enable UTF8 if the server supports it and set the hierarchy
+        delimiter. Does not raise any error if UTF8 could not be enabled.
+        Typically used right after login."""
+        if not self._is_utf8_supported():
+            self._set_hierarchy_delimiter()
+            return
+
+        # ENABLE is sent right behind NAMESPACE, saves a round trip.
+        namespace_result, utf8_enable_result = self._pipeline(
+            ("NAMESPACE",),
+            ("ENABLE", "UTF8=ACCEPT"),
+        )
+        self._is_utf8_enabled = utf8_enable_result[0] == "OK"
+        if not self._is_utf8_enabled:
+            print(f"Could not enable UTF-8: {utf8_enable_result[1]}")
 
-    def _set_hierarchy_delimiter(self) -> bool:
+        self._set_hierarchy_delimiter(namespace_result)
+
+    def _set_hierarchy_delimiter(self, namespace_result: tuple[str, List] | None = None) -> bool:
         """Find the hierarchy delimiter from NAMESPACE and set it.
-        Raises an error if not found. Typically used right after login."""
+        Raises an error if not found. Typically used right after login.
+        `namespace_result` can be given if NAMESPACE has already been sent."""
         # https://datatracker.ietf.org/doc/html/rfc9051#name-namespace-command
-        status, message = self.namespace()
+        status, message = namespace_result or self.namespace()
         if status != "OK":
             raise IMAPManagerException(
                 f"Could not receive namespace response to find hierarchy delimiter: {message}"
@@ -340,26 +445,36 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
     # Overrides of IMAP4 Command functions to handling IDLING
 
-    @staticmethod
-    def handle_idle(imap4_cmd: Callable):
-        """
-        Before calling imap4 command, handles the continuous IDLE mode and
-        raise IMAPManagerLoggedOutException if the IMAPManager is logged
-        out because of timeout.
+    @contextmanager
+    def _idle_paused(self, command_name: str, wrap_errors: bool = True) -> Iterator[None]:
         """
+        Leaves the continuous IDLE mode before running the command
+        `command_name` and restores it afterwards, even if the command
+        fails. Raises IMAPManagerLoggedOutException if the IMAPManager
+        is logged out because of timeout.
 
-        def wrapper(self, *args, **kwargs):
-            def is_logout_error(err_msg: str) -> bool:
-                """Checks the imap connection whether it still connected with err_msg."""
-                return self.state == "LOGOUT" and any(
-                    item.lower() in err_msg for item in ("AUTH", "SELECTED")
-                )
+        Errors of the command are raised as IMAPManagerException, if
+        `wrap_errors` is False only the imaplib errors are and the
+        others are re-raised unchanged.
 
+        Commands called while another command is already running on
+        the same thread (e.g. `uid` in `get_emails`) only have their
+        errors translated, IDLE is handled once by the outermost one.
+        """
+        def is_logout_error(err_msg: str) -> bool:
+            """Checks the imap connection whether it still connected with err_msg."""
+            return self.state == "LOGOUT" and any(
+                item.lower() in err_msg for item in ("AUTH", "SELECTED")
+            )
+
+        depth = getattr(self._idle_pause_depth, "value", 0)
+        was_idle_before_call = False
+        if depth == 0:
             if not self._idle_command_in_process_event.is_set():
-                print("Command: ", imap4_cmd.__name__, "Already in idle waiting...")
+                logger.debug("Command: %s Already in idle waiting...", command_name)
                 """
                 For `_idle_command_in_process_event` to be set,
-                `_wait_response` must be equal to `WaitResponse.IDLE`,
+                the `WaitResponse.IDLE` response must be received,
                 Since a TimeoutError will be raised if it is not set
                 within WAIT_RESPONSE_TIMEOUT, there is no need to
                 provide any timeout to this wait or to consider anything
@@ -370,7 +485,6 @@ class IMAPManager(imaplib.IMAP4_SSL):
             was_idle_before_call = (
                 self.is_idle() or self.is_idle_activation_countdown_continue()
             )
-            # print("Was Idle Before Call: ", was_idle_before_call, "Command: ", imap4_cmd.__name__)
             try:
                 if was_idle_before_call:
                     self.done()
@@ -379,7 +493,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
             except Exception as e:
                 if is_logout_error(str(e).lower()):
                     raise IMAPManagerLoggedOutException(
-                        f"To perform this command `{imap4_cmd.__name__}`, the IMAPManager must be logged in: {str(e)}"
+                        f"To perform this command `{command_name}`, the IMAPManager must be logged in: {str(e)}"
                     ) from None
                 else:
                     print(f"Unexpected error while leaving IDLE mode: {str(e)}")
@@ -389,34 +503,64 @@ class IMAPManager(imaplib.IMAP4_SSL):
                         "Active IDLE session set to None and threads stopped forcefully."
                     )
 
-            try:
-                result = imap4_cmd(self, *args, **kwargs)
-            except Exception as e:
-                if is_logout_error(str(e).lower()):
-                    raise IMAPManagerLoggedOutException(
-                        f"To perform this command `{imap4_cmd.__name__}`, the IMAPManager must be logged in: {str(e)}"
-                    ) from None
-                else:
-                    raise IMAPManagerException(
-                        f"Error while running command `{imap4_cmd.__name__}`: {str(e)}`"
-                    ) from e
+        self._idle_pause_depth.value = depth + 1
+        is_command_succeeded = False
+        try:
+            yield
+            is_command_succeeded = True
+        except IMAPManagerException:
+            raise
+        except Exception as e:
+            if not wrap_errors and not isinstance(e, imaplib.IMAP4.error):
+                raise
+            if is_logout_error(str(e).lower()):
+                raise IMAPManagerLoggedOutException(
+                    f"To perform this command `{command_name}`, the IMAPManager must be logged in: {str(e)}"
+                ) from None
+            else:
+                raise IMAPManagerException(
+                    f"Error while running command `{command_name}`: {str(e)}`"
+                ) from e
+        finally:
+            self._idle_pause_depth.value = depth
 
             # Restore IDLE mode.
             try:
-                # print("Restore - ", "Was Idle Before Call: ", was_idle_before_call, "Command: ", imap4_cmd.__name__)
-                if was_idle_before_call and imap4_cmd.__name__.lower() != "logout":
+                if was_idle_before_call and command_name.lower() != "logout":
                     self.idle()
-                # else:
-                #    self._resume_readline_for_imapmanager()
             except Exception as e:
                 print(f"Unexpected error while restoring IDLE mode: {str(e)}")
-                was_idle_before_call = False
                 print(
                     "IDLE mode could not be restored. IDLE mode completely disabled. Run `idle()` to re-enable IDLE mode if needed."
                 )
-                raise IMAPManagerException(str(e))
+                # Error of the command is more relevant than this one.
+                if is_command_succeeded:
+                    raise IMAPManagerException(str(e))
+
+    def idle_paused(self) -> AbstractContextManager[None]:
+        """
+        Leaves IDLE mode once for every command run inside the block
+        and restores it once at the end, instead of once per command.
+        Errors raised inside the block are re-raised unchanged, except
+        the imaplib ones which are raised as IMAPManagerException.
+
+        Example:
+            >>> with imap.idle_paused():
+            ...     imap.search_emails("INBOX", "test")
+            ...     imap.get_emails()
+        """
+        return self._idle_paused("idle_paused", wrap_errors=False)
+
+    @staticmethod
+    def handle_idle(imap4_cmd: Callable):
+        """
+        Runs the imap4 command inside `_idle_paused`, see
+        `_idle_paused` for details.
+        """
 
-            return result
+        def wrapper(self, *args, **kwargs):
+            with self._idle_paused(imap4_cmd.__name__):
+                return imap4_cmd(self, *args, **kwargs)
 
         return wrapper
 
@@ -438,6 +582,9 @@ class IMAPManager(imaplib.IMAP4_SSL):
     @override
     @handle_idle
     def close(self):
+        # CLOSE expunges the deleted emails of the selected folder.
+        self._email_flags_cache.clear()
+        self._clear_selected_folder()
         return super().close()
 
     @override
@@ -448,11 +595,14 @@ class IMAPManager(imaplib.IMAP4_SSL):
     @override
     @handle_idle
     def create(self, mailbox: str):
+        self._clear_folder_caches()
         return super().create(mailbox)
 
     @override
     @handle_idle
     def delete(self, mailbox: str):
+        self._clear_folder_caches()
+        self._clear_selected_folder()
         return super().delete(mailbox)
 
     @override
@@ -468,6 +618,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
     @override
     @handle_idle
     def expunge(self):
+        self._email_flags_cache.clear()
         return super().expunge()
 
     @override
@@ -520,10 +671,11 @@ class IMAPManager(imaplib.IMAP4_SSL):
         Notes:
             - UTF-8 encoding is enabled after successful authentication.
             - Supports both ASCII and non-ASCII credentials.
-            - 'password' will be quoted.
+            - SASL PLAIN is used whenever the server advertises it, LOGIN
+            (where 'password' will be quoted) is only the fallback.
         """
         login_result = None
-        if contains_non_ascii(user) or contains_non_ascii(password):
+        if "AUTH=PLAIN" in self.capabilities:
             login_result = self.authenticate(
                 "PLAIN", lambda x: bytes("\x00" + user + "\x00" + password, "utf-8")
             )
@@ -535,11 +687,61 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 f"Could not logged in to the target IMAP server: {login_result[1]}"
             )
 
-        self._enable_utf8()
-        self._set_hierarchy_delimiter()
+        self._refresh_capabilities()
+        self._enable_compression()
+        self._enable_utf8_and_set_hierarchy_delimiter()
 
         return (True, "Succesfully logged in to the target IMAP server")
 
+    def _enable_compression(self) -> bool:
+        """
+        Compress the rest of the connection with DEFLATE if the server
+        supports `COMPRESS=DEFLATE`. Headers and bodies are highly
+        compressible so every fetch moves far less bytes.
+
+        Returns:
+            bool: True if the compression is enabled, False otherwise.
+        """
+        if "COMPRESS=DEFLATE" not in self.capabilities:
+            return False
+
+        try:
+            # Sent without `_command`, so COMPRESS does not have to be
+            # added to the global command table of imaplib.
+            tag = self._new_tag()
+            self.tagged_commands[tag] = None
+            self.send(b"%s COMPRESS DEFLATE\r\n" % tag)
+            status, _ = self._command_complete("COMPRESS", tag)
+        except Exception as e:
+            logger.warning("COMPRESS DEFLATE could not enabled: %s", e)
+            return False
+
+        if status != "OK":
+            return False
+
+        # Server starts to compress right after its OK response, so
+        # nothing compressed is buffered in the old file yet.
+        self._compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        self.file.close()
+        self.file = io.BufferedReader(
+            _InflatingSocketReader(self.sock), buffer_size=READ_BUFFER_SIZE
+        )
+        return True
+
+    @override
+    def send(self, data: bytes):
+        """
+        Overrides the `send` method to compress the data when the
+        compression is enabled.
+        """
+        if not self._compressor:
+            super().send(data)
+            return
+
+        with self._compressor_lock:
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            super().send(data)
+
     @override
     @handle_idle
     def logout(self) -> IMAPCommandResult:
@@ -557,6 +759,11 @@ class IMAPManager(imaplib.IMAP4_SSL):
             self._idling_event.set()
             self._readline_event.set()
             self._current_idle = None
+            self._clear_folder_caches()
+            self._clear_selected_folder()
+            self._email_content_cache.clear()
+            self._email_flags_cache.clear()
+            self._bodystructure_cache.clear()
             if self._readline_thread.is_alive():
                 self._readline_thread.join(timeout=JOIN_TIMEOUT)
             if self._idling_thread.is_alive():
@@ -590,6 +797,17 @@ class IMAPManager(imaplib.IMAP4_SSL):
     def noop(self):
         return super().noop()
 
+    @override
+    def open(self, host: str = "", port: int = IMAP_PORT, timeout: float | None = None):
+        """
+        Overrides the `open` method to read the socket with a larger
+        buffer than the default `io.DEFAULT_BUFFER_SIZE`, so bursts of
+        responses and big FETCH literals are read with fewer `recv` calls.
+        """
+        super().open(host, port, timeout)
+        self.file.close()
+        self.file = self.sock.makefile("rb", buffering=READ_BUFFER_SIZE)
+
     @override
     @handle_idle
     def partial(self, message_num: str, message_part: str, start: str, length: str):
@@ -603,6 +821,8 @@ class IMAPManager(imaplib.IMAP4_SSL):
     @override
     @handle_idle
     def rename(self, oldmailbox: str, newmailbox: str):
+        self._clear_folder_caches()
+        self._clear_selected_folder()
         return super().rename(oldmailbox, newmailbox)
 
     @override
@@ -615,11 +835,23 @@ class IMAPManager(imaplib.IMAP4_SSL):
     def select(self, folder: str | Folder, readonly: bool = False) -> IMAPCommandResult:
         """
         Overrides the `select` method to handle the `Folder` enum type.
+        Does nothing if the folder is already selected in the same mode.
         """
         folder = self.find_matching_folder(folder) or (
             self._encode_folder(folder) if isinstance(folder, str) else folder
         )  # type: ignore
 
+        if (
+            self.state == "SELECTED"
+            and self._selected_folder == folder
+            and self._selected_readonly == readonly
+        ):
+            # SELECT would reset the untagged responses, unsolicited ones
+            # that no command pops (e.g. after `UID MOVE`) must not pile up.
+            for response_name in SELECT_RESET_RESPONSES:
+                self.untagged_responses.pop(response_name, None)
+            return (True, f"Successfully selected {folder}")
+
         result = self._parse_command_result(
             super().select(folder, readonly),
             success_message=f"Successfully selected {folder}",
@@ -627,8 +859,16 @@ class IMAPManager(imaplib.IMAP4_SSL):
         )
 
         if not result[0]:
+            self._selected_folder = self._selected_uidvalidity = None
             raise IMAPManagerException(result[1])
 
+        self._selected_folder = folder
+        self._selected_readonly = readonly
+
+        # Uids are only valid with the UIDVALIDITY of the folder they
+        # belong to, so it is kept to validate the cached emails.
+        self._selected_uidvalidity = self.response("UIDVALIDITY")[1][0]
+
         return result
 
     @override
@@ -689,6 +929,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
     @override
     @handle_idle
     def unselect(self):
+        self._clear_selected_folder()
         return super().unselect()
 
     @override
@@ -696,6 +937,70 @@ class IMAPManager(imaplib.IMAP4_SSL):
     def xatom(self, name: str, *args: str):
         return super().xatom(name, *args)
 
+    @handle_idle
+    def _pipeline(self, *commands: tuple[str, ...]) -> List[tuple[str, List]]:
+        """
+        Send all of the given commands back to back without waiting for
+        their responses, then collect the responses in the same order.
+        Saves one round trip per command compared to running them one by
+        one.
+
+        RFC 3501 section 5.5 allows a server to execute pipelined commands
+        concurrently, unless doing so would make their results ambiguous,
+        in which case it must execute them in the given order. Untagged
+        responses are assigned to the command whose tagged response is read
+        next, so only pipeline commands whose untagged responses can not
+        be mixed up (different response types, or commands the server must
+        run in order because one affects the other).
+
+        Args:
+            *commands (tuple[str, ...]): Commands to send, each one is a tuple
+            of the command name and its arguments.
+
+        Returns:
+            List[tuple[str, List]]: Results of the commands in the order they
+            are given, same as the return value of `uid`, `store`, etc.
+
+        Raises:
+            imaplib.IMAP4.error: If any of the commands gets a BAD response,
+            raised only after the responses of all commands are read, so
+            none of them is left on the connection.
+
+        Example:
+            >>> self._pipeline(
+            ...    ("UID", "FETCH", "1,2", "(BODY.PEEK[1])"),
+            ...    ("UID", "FETCH", "3", "(BODY.PEEK[1.1])")
+            ... )
+            [("OK", [(b'1 (UID 1 BODY[1] {12}', b'Hello World!'), ...]), ("OK", [...])]
+        """
+        tags = [self._command(*command) for command in commands]
+
+        results = []
+        error = None
+        for command, tag in zip(commands, tags):
+            name = command[0].upper()
+            response_name = name
+            if name == "UID":
+                response_name = command[1].upper()
+                if response_name not in ("SEARCH", "SORT", "THREAD", "EXPUNGE"):
+                    response_name = "FETCH"
+            try:
+                status, data = self._command_complete(name, tag)
+            except self.abort:
+                # Connection is unusable, nothing more can be read.
+                raise
+            except self.error as e:
+                # BAD is raised after its tagged response is read, the
+                # remaining tags must still be collected.
+                error = error or e
+                continue
+            results.append(self._untagged_response(status, data, response_name))
+
+        if error:
+            raise error
+
+        return results
+
     # IMAPManager commands
 
     def is_supported(self, keyword: str) -> bool:
@@ -788,10 +1093,9 @@ class IMAPManager(imaplib.IMAP4_SSL):
             self._current_idle = IMAPManager.IdleSession(
                 tag=self._new_tag(), start_time=time.time()
             )
+            self._response_events[IMAPManager.WaitResponse.IDLE].clear()
             self.send(b"%s IDLE\r\n" % self._current_idle.tag)
-            print(
-                f"'IDLE' command sent with tag: {self._current_idle.tag} at {datetime.now()}."
-            )
+            logger.debug("'IDLE' command sent with tag: %s.", self._current_idle.tag)
 
             self._wait_for_response(IMAPManager.WaitResponse.IDLE)
 
@@ -810,19 +1114,26 @@ class IMAPManager(imaplib.IMAP4_SSL):
             )
 
         self.socket().settimeout(None)
-        print("`_start_reading_lines` started on its own thread...")
+        logger.debug("`_start_reading_lines` started on its own thread...")
         while not self._release_idle_loops_event.is_set():
-            if not self._readline_event.is_set():
-                try:
-                    print(f"Waiting for new line since {datetime.now()}...")
-                    response = self.readline()
-                    if response:
-                        print(f"New response received: {response} at {datetime.now()}.")
-                        self._handle_response(response)
-                except (TimeoutError, OSError):
-                    print(f"Readline timed out at {datetime.now()}.")
-                    pass
-            self._release_idle_loops_event.wait(timeout=1)
+            if self._readline_event.is_set():
+                # Socket belongs to IMAP4 for now, check back later.
+                self._release_idle_loops_event.wait(timeout=1)
+                continue
+
+            try:
+                logger.debug("Waiting for new line...")
+                # Blocks until a line arrives, so the next line is read
+                # right after the current one is handled.
+                response = self.readline()
+                if response:
+                    logger.debug("New response received: %s.", response)
+                    self._handle_response(response)
+            except (TimeoutError, OSError):
+                if self._release_idle_loops_event.is_set():
+                    break
+                logger.debug("Readline timed out.")
+                self._release_idle_loops_event.wait(timeout=1)
 
     def _start_idle_lifecycle(self) -> None:
         """
@@ -839,17 +1150,38 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 "`_start_idle_lifecycle` cannot be started, if `_current_idle` is None."
             )
 
-        print(f"'IDLE' lifecycle creating for {self._current_idle.tag} ...")
+        logger.debug("'IDLE' lifecycle creating for %s ...", self._current_idle.tag)
         while not self._release_idle_loops_event.is_set():
-            if not self._idling_event.is_set() and self._current_idle is not None:
-                print(f"IDLING for {self._current_idle.tag} at {datetime.now()}.")
-                if time.time() - self._current_idle.start_time > IDLE_TIMEOUT:
-                    print(
-                        f"IDLING timeout reached for {self._current_idle.tag} at {datetime.now()}."
-                    )
-                    self.done()
-                    self.idle()
-            self._release_idle_loops_event.wait(timeout=1)
+            if self._idling_event.is_set() or self._current_idle is None:
+                # Any session started during this wait times out after
+                # it ends, so there is no need to check more often.
+                self._release_idle_loops_event.wait(timeout=IDLE_TIMEOUT)
+                continue
+
+            if self._wait_for_idle_timeout():
+                self.done()
+                self.idle()
+
+    def _wait_for_idle_timeout(self) -> bool:
+        """
+        Sleeps until the current IDLE session reaches IDLE_TIMEOUT
+        instead of checking it every second. Returns True if the
+        timeout is reached, False if the session is no longer the same
+        or the idle loops are released.
+        """
+        current_idle = self._current_idle
+        if current_idle is None:
+            return False
+
+        logger.debug("IDLING for %s.", current_idle.tag)
+        remaining = current_idle.start_time + IDLE_TIMEOUT - time.time()
+        if remaining > 0 and self._release_idle_loops_event.wait(timeout=remaining):
+            return False
+        if self._current_idle is not current_idle or self._idling_event.is_set():
+            return False
+
+        logger.debug("IDLING timeout reached for %s.", current_idle.tag)
+        return True
 
     def _start_optimized_idle_lifecycle(self) -> None:
         """
@@ -863,7 +1195,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
             )
 
         while not self._release_idle_loops_event.is_set():
-            print(f"IDLE activation countdown started at {datetime.now()}...")
+            logger.debug("IDLE activation countdown started...")
             while (
                 self._idle_activation_countdown > 0
                 and not self._release_idle_loops_event.is_set()
@@ -878,25 +1210,26 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
             if self._release_idle_loops_event.is_set():
                 self._is_idle_activation_countdown_continue = False
-                print(
+                logger.debug(
                     "Idle Manager terminated while waiting for countdown. Breaking lifecycle..."
                 )
                 break
 
-            print(f"IDLE activation countdown finished at {datetime.now()}...")
+            logger.debug("IDLE activation countdown finished...")
 
             # Before starting idle mode, select inbox to receive exists
             # messages: https://datatracker.ietf.org/doc/html/rfc2177.html#autoid-3
             self.select(Folder.Inbox, readonly=True)
             idle_tag = self._new_tag()
+            self._response_events[IMAPManager.WaitResponse.IDLE].clear()
             self.send(b"%s IDLE\r\n" % idle_tag)
-            print(f"'IDLE' command sent with tag: {idle_tag} at {datetime.now()}.")
+            logger.debug("'IDLE' command sent with tag: %s.", idle_tag)
             self._idle_command_in_process_event.clear()
 
             self._wait_for_response(IMAPManager.WaitResponse.IDLE)
             if self._release_idle_loops_event.is_set():
                 self._is_idle_activation_countdown_continue = False
-                print("Idle Manager is desctructed while waiting for IDLE response.")
+                logger.debug("Idle Manager is desctructed while waiting for IDLE response.")
                 break
 
             self._current_idle = IMAPManager.IdleSession(
@@ -905,19 +1238,16 @@ class IMAPManager(imaplib.IMAP4_SSL):
             self._is_idle_activation_countdown_continue = False
             self._idle_command_in_process_event.set()
 
-            print(
-                f"Optimized 'IDLE' lifecycle creating for {self._current_idle.tag} ..."
+            logger.debug(
+                "Optimized 'IDLE' lifecycle creating for %s ...", self._current_idle.tag
             )
             while not self._release_idle_loops_event.is_set():
                 if not self._idling_event.is_set() and self._current_idle is not None:
-                    print(f"IDLING for {self._current_idle.tag} at {datetime.now()}.")
-                    if time.time() - self._current_idle.start_time > IDLE_TIMEOUT:
-                        print(
-                            f"IDLING timeout reached for {self._current_idle.tag} at {datetime.now()}."
-                        )
+                    if self._wait_for_idle_timeout():
                         self.done()
                         self.idle()
                         break
+                    continue
                 self._release_idle_loops_event.wait(timeout=1)
 
     def done(self) -> None:
@@ -927,8 +1257,9 @@ class IMAPManager(imaplib.IMAP4_SSL):
             return
 
         self._idling_event.set()
+        self._response_events[IMAPManager.WaitResponse.DONE].clear()
         self.send(b"DONE\r\n")
-        print(f"DONE command sent for {self._current_idle.tag} at {datetime.now()}.")
+        logger.debug("DONE command sent for %s.", self._current_idle.tag)
         self._wait_for_response(IMAPManager.WaitResponse.DONE)
 
         self._readline_event.set()
@@ -936,7 +1267,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
         self._current_idle = None
         self._is_idle_activation_countdown_continue = False
         self._release_readline_for_imap4(True)
-        print(f"DONE for {temp_tag} handled. IDLE terminated.")
+        logger.debug("DONE for %s handled. IDLE terminated.", temp_tag)
 
     def _release_readline_for_imap4(self, force: bool = False):
         """
@@ -950,9 +1281,9 @@ class IMAPManager(imaplib.IMAP4_SSL):
         if not self._readline_event.is_set():
             self._readline_event.set()
             # This will release self.readline in readline_thread
-            super().send(b"%s NOOP\r\n" % self._new_tag())
+            self.send(b"%s NOOP\r\n" % self._new_tag())
         elif force:
-            super().send(b"%s NOOP\r\n" % self._new_tag())
+            self.send(b"%s NOOP\r\n" % self._new_tag())
 
     def _resume_readline_for_imapmanager(self):
         """
@@ -969,6 +1300,10 @@ class IMAPManager(imaplib.IMAP4_SSL):
         Args:
             wait_response (IMAPManager.WaitResponse): Expected response type to wait for
 
+        The event of `wait_response` must be cleared before sending
+        the command. Returns as soon as the event is set by the response
+        handler, other conditions are checked once per second.
+
         Times out after WAIT_RESPONSE_TIMEOUT seconds and resets wait state.
         """
         if not wait_response or wait_response not in IMAPManager.WAIT_RESPONSE_LIST:
@@ -976,27 +1311,23 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 f"`wait_response` must be one of the {IMAPManager.WAIT_RESPONSE_LIST}."
             )
 
-        counter = 0
-        while (
-            self._wait_response != wait_response
-            and not self._release_idle_loops_event.is_set()
-        ):
-            print(f"Waiting for {wait_response} response at {datetime.now()}...")
-            if not self._readline_event.is_set():
-                counter += 1
-                if counter > WAIT_RESPONSE_TIMEOUT:
-                    if self._current_idle:
-                        print(
-                            "Wait response timeout reached, current idle set to None."
-                        )
-                        self._current_idle = None
-                    self._wait_response = None
-                    raise TimeoutError(
-                        f"IMAPManager.WaitResponse: {wait_response} did not received in time at {datetime.now()}."
-                    )
-            else:
+        response_event = self._response_events[wait_response]
+        deadline = time.monotonic() + WAIT_RESPONSE_TIMEOUT
+        logger.debug("Waiting for %s response...", wait_response)
+        while not response_event.wait(timeout=1):
+            if self._release_idle_loops_event.is_set():
+                return
+            if self._readline_event.is_set():
                 raise Exception("Readline is set while waiting for response.")
-            self._release_idle_loops_event.wait(timeout=1)
+            if time.monotonic() > deadline:
+                if self._current_idle:
+                    print(
+                        "Wait response timeout reached, current idle set to None."
+                    )
+                    self._current_idle = None
+                raise TimeoutError(
+                    f"IMAPManager.WaitResponse: {wait_response} did not received in time at {datetime.now()}."
+                )
 
     def _handle_response(self, response: bytes):
         """
@@ -1007,16 +1338,24 @@ class IMAPManager(imaplib.IMAP4_SSL):
         Args:
             response (bytes): The raw server response to be processed.
         """
-        if b"idling" in response:
+        # Responses are told apart by their prefix, keywords are never
+        # searched in the whole line so they can't match a payload.
+        if response.startswith(b"+"):
+            # Continuation request of IDLE e.g. `+ idling`
             self._handle_idle_response()
-        elif (
-            b"OK" in response and self.is_idle() and self._current_idle.tag in response
-        ):  # type: ignore
+        elif response.startswith(b"* "):
+            # Only untagged lines are split, e.g.
+            # `* 3 EXISTS` -> [b"*", b"3", b"EXISTS"]
+            parts = response.split(None, 3)
+            if parts[1:2] == [b"BYE"]:
+                self._handle_bye_response()
+            elif parts[2:3] == [b"EXISTS"] and self._listen_new_messages:
+                self._handle_exists_response(response)
+        elif self.is_idle() and response.startswith(
+            self._current_idle.tag + b" OK"  # type: ignore
+        ):
+            # `_new_tag` already returns bytes, e.g. `b"ABCD5 OK"`
             self._handle_done_response()
-        elif b"BYE" in response:
-            self._handle_bye_response()
-        elif b"EXISTS" in response and self._listen_new_messages:
-            self._handle_exists_response(response)
 
     def _handle_idle_response(self):
         """
@@ -1024,7 +1363,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
         This method shouldn't be called directly, but rather
         through the `handle_response` method.
         """
-        self._wait_response = IMAPManager.WaitResponse.IDLE
+        self._response_events[IMAPManager.WaitResponse.IDLE].set()
 
     def _handle_done_response(self):
         """
@@ -1032,7 +1371,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
         This method shouldn't be called directly, but rather
         through the `handle_response` method.
         """
-        self._wait_response = IMAPManager.WaitResponse.DONE
+        self._response_events[IMAPManager.WaitResponse.DONE].set()
 
     def _handle_exists_response(self, response: bytes):
         """
@@ -1045,8 +1384,8 @@ class IMAPManager(imaplib.IMAP4_SSL):
         Args:
             response (bytes): The server's EXISTS response data.
         """
-        print(f"'EXISTS' message of server catched at {datetime.now()}.")
-        self._wait_response = IMAPManager.WaitResponse.EXISTS
+        logger.debug("'EXISTS' message of server catched.")
+        self._response_events[IMAPManager.WaitResponse.EXISTS].set()
         size = MessageParser.get_exists_size(
             MessageParser.group_messages(response)[0]
         )
@@ -1056,6 +1395,11 @@ class IMAPManager(imaplib.IMAP4_SSL):
             received_at = datetime.now() - timedelta(minutes=EMAIL_LOOKBACK_WINDOW)
             received_at = received_at.astimezone(ZoneInfo("UTC"))
             self._new_message_timestamps.append(received_at)
+            for listener in list(self._new_message_listeners):
+                try:
+                    listener()
+                except Exception as e:
+                    print(f"Error while notifying new message listener: {str(e)}")
 
     def _handle_bye_response(self):
         """
@@ -1065,8 +1409,8 @@ class IMAPManager(imaplib.IMAP4_SSL):
         method shouldn't be called directly, but rather through the
         `handle_response`method.
         """
-        print(f"'BYE' message of server catched at {datetime.now()}.")
-        self._wait_response = IMAPManager.WaitResponse.BYE
+        logger.debug("'BYE' message of server catched.")
+        self._response_events[IMAPManager.WaitResponse.BYE].set()
 
         if not self._idling_event.is_set():
             self.idling_event.set()
@@ -1102,38 +1446,106 @@ class IMAPManager(imaplib.IMAP4_SSL):
         References:
             https://datatracker.ietf.org/doc/html/rfc9051#name-formal-syntax (check sequence-set for more information.)
         """
-        if not SEQUENCE_SET_PATTERN.match(sequence_set):
+        sorted_uids = [int(uid) for uid in uids if uid]
+        if not sorted_uids:
             return False
 
-        max_uid = uids[-1]
-        expanded = set()
-        segments = sequence_set.split(",")
+        intervals = self._parse_sequence_set(sequence_set, sorted_uids[-1])
+        if intervals is None:
+            return False
 
-        for segment in segments:
-            if ":" in segment:
-                parts = segment.split(":")
-                if parts[0] == "*":
-                    start = int(max_uid)
-                else:
-                    start = int(parts[0])
+        # Every segment is checked as an interval instead of expanding
+        # it. Since uids are unique and sorted, [start, end] is fully
+        # present only if `start` is found and the uid `end - start`
+        # positions after it is `end`.
+        len_sorted_uids = len(sorted_uids)
+        for start, end in intervals:
+            i = bisect.bisect_left(sorted_uids, start)
+            j = i + (end - start)
+            if j >= len_sorted_uids or sorted_uids[i] != start or sorted_uids[j] != end:
+                return False
 
-                if parts[-1] == "*":
-                    end = int(max_uid)
-                else:
-                    end = int(parts[-1])
+        return True
 
-                expanded.update(list(range(start, end + 1)), [max(start, end)])
-            else:
-                if segment == "*":
-                    expanded.add(max_uid)
+    @staticmethod
+    def _parse_sequence_set(sequence_set: str, max_uid: int = 0) -> List[tuple[int, int]] | None:
+        """
+        Parse `sequence_set` into `(start, end)` intervals in a single
+        pass over its characters. `*` is replaced with `max_uid`.
+
+        Args:
+            sequence_set (str): A string representing a set of sequences as defined in RFC 9051.
+            max_uid (int): Value of `*`.
+
+        Returns:
+            List[tuple[int, int]] | None: Intervals in the order they are given,
+            `None` if `sequence_set` is not valid.
+
+        Example:
+            >>> _parse_sequence_set("1,3:6,9")
+            [(1, 1), (3, 6), (9, 9)]
+            >>> _parse_sequence_set("*:4,5:7", 10)
+            [(4, 10), (5, 7)]
+            >>> _parse_sequence_set("1,*")
+            None
+        """
+        STAR = -1
+        intervals = []
+        # Segments are separated by `,` and numbers of a segment by `:`,
+        # only the first and the last number of a segment are kept.
+        segment_index = number_index = 0
+        first = number = None
+        star_at = None
+        token_counts = []
+        for char in sequence_set:
+            if "0" <= char <= "9":
+                if number == STAR:
+                    return None
+                number = (number or 0) * 10 + ord(char) - 48
+            elif char == "*":
+                if number is not None or star_at is not None:
+                    return None
+                number = STAR
+                star_at = (segment_index, number_index)
+            elif char == ":" or char == ",":
+                if number is None:
+                    return None
+                if number_index == 0:
+                    first = number
+                if char == ":":
+                    number_index += 1
                 else:
-                    expanded.add(segment)
+                    intervals.append((first, number))
+                    token_counts.append(number_index + 1)
+                    segment_index += 1
+                    number_index = 0
+                number = None
+            else:
+                return None
 
-        for sequence_set_uid in map(str, expanded):
-            if sequence_set_uid not in uids:
-                return False
+        if number is None:
+            return None
+        intervals.append((number if number_index == 0 else first, number))
+        token_counts.append(number_index + 1)
+
+        # `*` can only be used once, either alone or as the start of
+        # the first range or as the end of the last range.
+        if star_at is not None and sequence_set != "*":
+            star_segment, star_number = star_at
+            token_count = token_counts[star_segment]
+            if token_count < 2 or not (
+                (star_segment == 0 and star_number == 0)
+                or (star_segment == segment_index and star_number == token_count - 1)
+            ):
+                return None
 
-        return True
+        return [
+            (min(start, end), max(start, end))
+            for start, end in (
+                (max_uid if start == STAR else start, max_uid if end == STAR else end)
+                for start, end in intervals
+            )
+        ]
 
     @handle_idle
     def find_matching_folder(
@@ -1158,27 +1570,70 @@ class IMAPManager(imaplib.IMAP4_SSL):
             b'"[Gmail]/Y\xc4\xb1ld\xc4\xb1zl\xc4\xb1"'
             >>> find_matching_folder(Folder.Flagged, encoded=False)
             b'"[Gmail]/Yıldızlı"' # Flagged in Turkish
+
+        Notes:
+            - Matches are cached for `FOLDER_LIST_CACHE_TTL` seconds, so
+            `select` doesn't send a LIST before every SELECT.
         """
-        if requested_folder.lower() not in FOLDER_LIST:
+        if requested_folder.lower() not in FOLDER_SET:
             return None
 
-        status, folders_as_bytes = self.list()
-        if status == "OK" and folders_as_bytes and isinstance(folders_as_bytes, list):
-            for folder_as_bytes in folders_as_bytes:
-                if (
-                    requested_folder.upper()
-                    in self._decode_folder(folder_as_bytes).upper()
-                ):
-                    if encoded:
-                        return self._encode_folder(
-                            self._extract_folder_name(folder_as_bytes)
-                        )
-                    else:
-                        return self._extract_folder_name(folder_as_bytes)
+        cache_key = (requested_folder.lower(), encoded)
+        if cache_key in self._folder_match_cache:
+            created_at, matching_folder = self._folder_match_cache[cache_key]
+            if time.monotonic() - created_at < FOLDER_LIST_CACHE_TTL:
+                return matching_folder  # type: ignore
+
+        if (
+            self._folder_list_cache is None
+            or time.monotonic() - self._folder_list_cache[0] >= FOLDER_LIST_CACHE_TTL
+        ):
+            status, folders_as_bytes = self.list()
+            if not (status == "OK" and folders_as_bytes and isinstance(folders_as_bytes, list)):
+                return None
+            # Lines are decoded and uppercased once instead of on every call.
+            self._folder_list_cache = (time.monotonic(), [
+                (self._decode_folder(folder_as_bytes).upper(), folder_as_bytes)
+                for folder_as_bytes in folders_as_bytes
+            ])
+
+        requested_folder_upper = requested_folder.upper()
+        for decoded_folder_upper, folder_as_bytes in self._folder_list_cache[1]:
+            if requested_folder_upper in decoded_folder_upper:
+                matching_folder = self._extract_folder_name(folder_as_bytes)
+                if encoded:
+                    matching_folder = self._encode_folder(matching_folder)
+                self._folder_match_cache[cache_key] = (time.monotonic(), matching_folder)
+                return matching_folder  # type: ignore
         return None
 
+    def _clear_folder_caches(self) -> None:
+        """
+        Clears the cached LIST results, must be called whenever the
+        folders change. Selected folder is kept, since only deleting
+        or renaming it (see `_clear_selected_folder`) invalidates it.
+        """
+        self._folders_cache.clear()
+        self._folder_list_cache = None
+        self._folder_match_cache.clear()
+        self._extracted_folder_name_cache.clear()
+
+    def _clear_selected_folder(self) -> None:
+        """
+        Forgets the selected folder, so the next `select` sends SELECT
+        even for the same folder. Must be called when the selected folder
+        may be deleted, renamed or closed.
+        """
+        self._selected_folder = None
+
     def _encode_folder(self, folder: str) -> bytes:
         """Encode a folder name into a byte string suitable for IMAP operations."""
+        if folder.isascii():
+            # Quoted before encoding, so only one bytes object is created.
+            return f'"{folder}"'.encode("ascii")
+
+        # Non-ASCII names are sent as UTF-8 (UTF8=ACCEPT is enabled
+        # after login) instead of modified UTF-7.
         try:
             return ('"' + folder + '"').encode("utf-8")
         except Exception as e:
@@ -1188,12 +1643,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
     def _decode_folder(self, folder: bytes) -> str:
         """Decode a folder name from a byte string returned by an IMAP server."""
-        try:
-            return folder.decode("utf-8")
-        except Exception as e:
-            raise IMAPManagerException(
-                f"Error while decoding folder name `{str(folder)}`: `{str(e)}`."
-            ) from None
+        return folder.decode("utf-8", errors="replace")
 
     def _check_folder_names(self, *folders: str, raise_error: bool = True) -> bool:
         """
@@ -1212,24 +1662,26 @@ class IMAPManager(imaplib.IMAP4_SSL):
             True
             >>> self._check_folder_names("INBOX", "Trash")
             True
-            >>> self._check_folder_names("")
+            >>> self._check_folder_names("In*box")
             raises ValueError
-            >>> self._check_folder_names("INBOX", raise_error=False)
+            >>> self._check_folder_names("In*box", raise_error=False)
             False
 
         Raises:
             ValueError: If the folder name is invalid and raise_error is True
+
+        Notes:
+            - Empty names are skipped, so optional folders can be passed as is.
+            - Names longer than `MAX_FOLDER_NAME_LENGTH` or containing NUL, CR,
+            LF, `*`, `%`, `"` or `\\` are invalid.
         """
         for folder_name in folders:
             if not folder_name:
                 continue
 
-            folder_name_length = len(folder_name)
             if (
-                folder_name is None
-                or folder_name == ""
-                or folder_name_length > MAX_FOLDER_NAME_LENGTH
-                or folder_name_length < 1
+                len(folder_name) > MAX_FOLDER_NAME_LENGTH
+                or folder_name.translate(FOLDER_NAME_FORBIDDEN_CHARS) != folder_name
             ):
                 if raise_error:
                     raise ValueError(f"Invalid folder name: `{folder_name}`")
@@ -1253,25 +1705,48 @@ class IMAPManager(imaplib.IMAP4_SSL):
             >>> _extract_folder_name(b'(\\HasNoChildren) "/" "INBOX"')
             'INBOX'
             >>> _extract_folder_name(b'(\\Junk \\HasNoChildren) "|" "[Gmail]/Spam"', tagged=False)
-            'Spam'
+            '[Gmail]/Spam'
             >>> _extract_folder_name(b'(\\Junk \\HasNoChildren) "|" "[Gmail]/Spam"', tagged=True)
-            '[Folder.Junk]:Spam'
+            'Junk:[Gmail]/Spam'
             >>> _extract_folder_name(b'(\\HasNoChildren) "|" "MyCustomFolder"')
             'MyCustomFolder'
 
         References:
             https://datatracker.ietf.org/doc/html/rfc9051#name-list-response
+
+        Notes:
+            - Extracted names are cached by the raw folder and `tagged` until
+            the folder caches are cleared.
         """
+        cache_key = (folder, tagged)
+        if cache_key in self._extracted_folder_name_cache:
+            return self._extracted_folder_name_cache[cache_key]
+
         try:
             if isinstance(folder, bytes):
                 folder = self._decode_folder(folder)
 
-            folder_parts = folder.split(f' "{self._hierarchy_delimiter}" ', 1)
-            folder_name = folder_parts[-1].replace('"', "")
-            folder_tag = folder_parts[0] if len(folder_parts) > 1 else None
+            # (flags) "delimiter" "name" or (flags) NIL "name"
+            folder_name, folder_tag = "", None
+            flags_end = folder.find(")")
+            if folder.startswith("(") and folder[flags_end + 1:flags_end + 2] == " ":
+                rest = folder[flags_end + 2:]
+                if rest.startswith("NIL "):
+                    name_start = 4
+                elif rest.startswith('"'):
+                    name_start = rest.find('"', 1) + 2
+                else:
+                    name_start = 0
+                if name_start > 1:
+                    folder_name = rest[name_start:].rstrip("\r\n").strip('"')
+                    folder_tag = folder[1:flags_end]
+
+            if not folder_name or '"' in folder_name:
+                folder_name, folder_tag = folder.replace('"', ""), None
 
-            if tagged and folder_tag:
+            if tagged and folder_tag is not None:
                 folder_tag = folder_tag.lower()
+                lowered_folder_name = folder_name.lower()
 
                 # Add folder tag to beginning of the folder name like if
                 # folder includes any. For example if folder is something like
@@ -1279,14 +1754,14 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 # "Trash:Trash Bin". This is important to ensure that the client
                 # can recognize the folder in a way that is not affected by any
                 # language or different spelling.
-                for standard_folder in FOLDER_LIST:
-                    standard_folder = standard_folder.lower()
+                for standard_folder, prefix in zip(FOLDER_LIST, TAGGED_FOLDER_PREFIXES):
                     if (
                         standard_folder in folder_tag
-                        or standard_folder == folder_name.lower()
+                        or standard_folder == lowered_folder_name
                     ):
-                        folder_name = f"{standard_folder.capitalize()}:{folder_name}"
+                        folder_name = f"{prefix}{folder_name}"
 
+            self._extracted_folder_name_cache[cache_key] = folder_name
             return folder_name
         except Exception as e:
             raise IMAPManagerException(
@@ -1317,16 +1792,24 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
         References:
             https://datatracker.ietf.org/doc/html/rfc9051#name-list-response
+
+        Notes:
+            - Results are cached for `FOLDER_LIST_CACHE_TTL` seconds, the cache
+            is cleared whenever a folder is created, deleted or renamed.
         """
+        cache_key = (folder_name, tagged)
+        if cache_key in self._folders_cache:
+            created_at, cached_folder_list = self._folders_cache[cache_key]
+            if time.monotonic() - created_at < FOLDER_LIST_CACHE_TTL:
+                return list(cached_folder_list)
+
         status, folders = self.list()
         if not status == "OK":
             raise IMAPManagerException(f"Failed to list folders with status: {status}.")
 
         folder_list = []
-        disallowed_keywords = [b"\\Noselect"]
-        disallowed_keywords = [keyword.lower() for keyword in disallowed_keywords]
         for folder in folders:
-            if not any(keyword in folder.lower() for keyword in disallowed_keywords):
+            if not NOSELECT_PATTERN.search(folder):
                 decoded_folder = self._extract_folder_name(folder, tagged=tagged)
                 if not folder_name or (
                     folder_name in decoded_folder
@@ -1341,13 +1824,11 @@ class IMAPManager(imaplib.IMAP4_SSL):
         # [..., 'customA', 'customA/customAB', 'customA/customAB/customABC', 'customB/customBA']
         folder_list.sort(
             key=lambda path: (
-                not any(
-                    path.startswith(f"{folder.capitalize()}:") for folder in FOLDER_LIST
-                ),
-                path.split(f"{self._hierarchy_delimiter}"),
-                len(path.split(f"{self._hierarchy_delimiter}")),
+                not path.startswith(TAGGED_FOLDER_PREFIXES),
+                path.split(self._hierarchy_delimiter),
             )
         )
+        self._folders_cache[cache_key] = (time.monotonic(), list(folder_list))
         return folder_list
 
     def build_search_criteria_query(self, search_criteria: SearchCriteria | str) -> str:
@@ -1402,7 +1883,6 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 >>> recursive_or_query("FROM", ["a@mail.com", "b@mail.com", "c@mail.com"])
                 'OR (FROM "a@mail.com") (OR (FROM "b@mail.com") (FROM "c@mail.com"))'
             """
-            query = ""
             len_search_keys = len(search_keys)
             if len_search_keys == 1:
                 return f'{criteria} "{search_keys[0]}"'
@@ -1411,7 +1891,7 @@ class IMAPManager(imaplib.IMAP4_SSL):
             left_part = recursive_or_query(criteria, search_keys[:mid])
             right_part = recursive_or_query(criteria, search_keys[mid:])
 
-            return query + f"OR ({left_part}) ({right_part})"
+            return f"OR ({left_part}) ({right_part})"
 
         def add_criterion(
             criteria: str,
@@ -1427,11 +1907,12 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 seperate_with_or (bool): Whether to combine multiple values with OR conditions.
 
             Returns:
-                str: A formatted query string for the given criterion.
+                str: A formatted query string for the given criterion, empty
+                if there is no value.
 
             Example:
                 >>> add_criterion("FROM", value=["a@mail.com", "b@mail.com"])
-                ' (FROM "a@mail.com") (FROM "b@mail.com")'
+                '(FROM "a@mail.com") (FROM "b@mail.com")'
             """
             if not value:
                 return ""
@@ -1441,19 +1922,19 @@ class IMAPManager(imaplib.IMAP4_SSL):
             elif isinstance(value, List):
                 if criteria == "":
                     # value=["Flagged", "Seen", "Answered"]
-                    return f" {' '.join([i.strip().upper() for i in value])}"
+                    return " ".join([i.strip().upper() for i in value])
 
                 if len(value) <= 1:
-                    return f' ({criteria.strip()} "{value[0].strip()}")'
+                    return f'({criteria.strip()} "{value[0].strip()}")'
 
             if seperate_with_or and len(value) > 1:
                 value = recursive_or_query(criteria, value)
                 criteria = ""
 
             if criteria:
-                return f" ({criteria.strip()} {add_quotes_if_str(value)})"
+                return f"({criteria.strip()} {add_quotes_if_str(value)})"
             else:
-                return f" ({value.strip()})"
+                return f"({value.strip()})"
 
         try:
             if isinstance(search_criteria, str):
@@ -1479,42 +1960,50 @@ class IMAPManager(imaplib.IMAP4_SSL):
                             )
                         )
 
-            search_criteria_query = ""
-            search_criteria_query += add_criterion(
-                "FROM",
-                extract_email_addresses(search_criteria.senders or []),
-                len(search_criteria.senders or []) > 1,
-            )
-            search_criteria_query += add_criterion(
-                "TO",
-                extract_email_addresses(search_criteria.receivers or []),
-                len(search_criteria.receivers or []) > 1,
-            )
-            search_criteria_query += add_criterion(
-                "CC",
-                extract_email_addresses(search_criteria.cc or []),
-                len(search_criteria.cc or []) > 1,
-            )
-            search_criteria_query += add_criterion(
-                "HEADER MESSAGE-ID",
-                search_criteria.message_id,
-                len(search_criteria.message_id or []) > 1,
-            )
-            search_criteria_query += add_criterion("SUBJECT", search_criteria.subject)
-            search_criteria_query += add_criterion("SINCE", search_criteria.since)
-            search_criteria_query += add_criterion("BEFORE", search_criteria.before)
-            search_criteria_query += add_criterion("BODY", search_criteria.include)
-            search_criteria_query += add_criterion("NOT BODY", search_criteria.exclude)
-            search_criteria_query += add_criterion("", flag_list)
-            search_criteria_query += add_criterion(
-                "TEXT", search_criteria.has_attachments and "ATTACHMENT" or ""
-            )
-            search_criteria_query += add_criterion(
-                "LARGER", search_criteria.larger_than
-            )
-            search_criteria_query += add_criterion(
-                "SMALLER", search_criteria.smaller_than
-            )
+            # Fragments are joined once at the end instead of growing
+            # the query string with every criterion.
+            query_parts = [
+                add_criterion(
+                    "FROM",
+                    extract_email_addresses(search_criteria.senders or []),
+                    len(search_criteria.senders or []) > 1,
+                ),
+                add_criterion(
+                    "TO",
+                    extract_email_addresses(search_criteria.receivers or []),
+                    len(search_criteria.receivers or []) > 1,
+                ),
+                add_criterion(
+                    "CC",
+                    extract_email_addresses(search_criteria.cc or []),
+                    len(search_criteria.cc or []) > 1,
+                ),
+                add_criterion(
+                    "HEADER MESSAGE-ID",
+                    search_criteria.message_id,
+                    len(search_criteria.message_id or []) > 1,
+                ),
+                add_criterion("SUBJECT", search_criteria.subject),
+                add_criterion("SINCE", search_criteria.since),
+                add_criterion("BEFORE", search_criteria.before),
+                add_criterion("BODY", search_criteria.include),
+                add_criterion("NOT BODY", search_criteria.exclude),
+                add_criterion("", flag_list),
+            ]
+            if search_criteria.has_attachments:
+                # Let the server decide instead of matching "attachment"
+                # word in the whole text of every email.
+                if self.is_supported("X-GM-EXT-1"):
+                    query_parts.append(add_criterion("X-GM-RAW", "has:attachment"))
+                else:
+                    query_parts.append(add_criterion(
+                        "",
+                        'OR HEADER CONTENT-TYPE "multipart/mixed" '
+                        'HEADER CONTENT-DISPOSITION "attachment"'
+                    ))
+            query_parts.append(add_criterion("LARGER", search_criteria.larger_than))
+            query_parts.append(add_criterion("SMALLER", search_criteria.smaller_than))
+            search_criteria_query = " ".join(part for part in query_parts if part)
         except Exception as e:
             raise IMAPManagerException(
                 f"Error while building search query from `{str(search_criteria)}`"
@@ -1546,13 +2035,13 @@ class IMAPManager(imaplib.IMAP4_SSL):
         """
 
         def save_search_result(
-            uids: List[str], folder: str | Folder, search_query: str
+            uids: array[int], folder: str | Folder, search_query: str
         ):
             """
             Save emails to a specified folder for later use.
 
             Args:
-                uids (list[str]): A list of email uids to save.
+                uids (array[int]): Email uids to save.
                 folder (str): The folder to save the emails to.
                 search_query (str): The search query used to fetch the emails.
             """
@@ -1571,15 +2060,34 @@ class IMAPManager(imaplib.IMAP4_SSL):
         self.select(folder, readonly=True)
 
         if search:
-            search_criteria_query = self.build_search_criteria_query(search).encode(
-                "utf-8"
-            )
+            search_criteria_query = self.build_search_criteria_query(search)
         else:
             search_criteria_query = "ALL"
 
+        # Every criterion, including `include` and `exclude`, is in the same
+        # query so it is sent as a single SEARCH. Non-ASCII terms need CHARSET
+        # unless UTF8=ACCEPT is enabled, in which case CHARSET must not be
+        # sent at all (RFC 6855, Section 3).
+        search_args = [search_criteria_query.encode("utf-8")]
+        if not self._is_utf8_enabled and contains_non_ascii(search_criteria_query):
+            search_args = ["CHARSET", "UTF-8", *search_args]
+
         # Searching emails
         try:
-            search_status, uids = self.uid("search", None, search_criteria_query)
+            if self.is_supported("ESEARCH"):
+                search_status, uid_array = self._search_uids_as_sequence_set(search_args)
+                if search_status != "OK":
+                    raise IMAPManagerException(
+                        f"Error while getting email uids, search query was `{search_criteria_query}` and error is `{search_status}.`"
+                    )
+
+                if not uid_array:
+                    return []
+
+                save_search_result(uid_array, folder, search_criteria_query)
+                return [str(uid) for uid in uid_array]
+
+            search_status, uids = self.uid("search", *search_args)
 
             if search_status != "OK":
                 raise IMAPManagerException(
@@ -1589,14 +2097,53 @@ class IMAPManager(imaplib.IMAP4_SSL):
             if not uids or not uids[0]:
                 return uids
 
-            uids = uids[0].decode().split()[::-1]
-            save_search_result(uids, folder, search_criteria_query)
-            return uids
+            uids = uids[0].split()[::-1]
+            save_search_result(array("I", map(int, uids)), folder, search_criteria_query)
+            return [uid.decode() for uid in uids]
         except Exception as e:
             raise IMAPManagerException(
                 f"Error while getting email uids, search query was `{search_criteria_query}` and error is `{str(e)}.`"
             )
 
+    def _search_uids_as_sequence_set(self, search_args: List[str | bytes]) -> tuple[str, array[int]]:
+        """
+        Search uids with `UID SEARCH RETURN (ALL)` (RFC 4731), server
+        responds with a sequence set like `1:500,502` instead of listing
+        every uid, so results of big folders are transferred in a few bytes.
+
+        Args:
+            search_args (List[str | bytes]): Arguments of the SEARCH command.
+
+        Returns:
+            tuple[str, array[int]]: Status of the command and the found uids
+            in descending order.
+
+        Example:
+            >>> _search_uids_as_sequence_set([b"ALL"])
+            ("OK", array('I', [502, 500, 499, ..., 1]))
+        """
+        status, _ = self._simple_command("UID", "SEARCH", "RETURN", "(ALL)", *search_args)
+        _, data = self._untagged_response(status, [None], "ESEARCH")
+        if status != "OK" or not data or not data[-1]:
+            return status, array("I")
+
+        # (TAG "A5") UID ALL 1:500,502
+        tokens = data[-1].split()
+        sequence_set = ""
+        for index in range(len(tokens) - 1):
+            if tokens[index].upper() == b"ALL":
+                sequence_set = tokens[index + 1].decode()
+                break
+
+        intervals = self._parse_sequence_set(sequence_set) if sequence_set else None
+        if not intervals:
+            return status, array("I")
+
+        uids = array("I")
+        for start, end in sorted(intervals, reverse=True):
+            uids.extend(range(end, start - 1, -1))
+        return status, uids
+
     @handle_idle
     def is_email_exists(self, folder: str, sequence_set: str) -> bool:
         """
@@ -1634,7 +2181,88 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 f"Error while checking emails `{sequence_set}`: `{status}`"
             )
 
-        return self._is_sequence_set_valid(sequence_set, data[0].decode().split(" "))
+        # Server only returns the uids of the set that exist, so they
+        # all exist if the counts are equal. No need to validate the set
+        # on the client side, invalid sets are already rejected by the server.
+        return len(data[0].split()) == self._count_sequence_set(sequence_set)
+
+    def _count_sequence_set(self, sequence_set: str) -> int:
+        """
+        Count the distinct uids of a `sequence_set` that doesn't contain `*`.
+
+        Example:
+            >>> _count_sequence_set("1,3:6,5:9")
+            8
+        """
+        intervals = self._parse_sequence_set(sequence_set)
+        if intervals is None:
+            return -1
+
+        count = 0
+        last_end = 0
+        for start, end in sorted(intervals):
+            start = max(start, last_end + 1)
+            if start <= end:
+                count += end - start + 1
+                last_end = end
+        return count
+
+    @staticmethod
+    def _build_sequence_set(uids: Iterable[int]) -> str:
+        """
+        Build a sequence set from uids, consecutive uids are collapsed
+        into ranges so the set is sent in far fewer bytes.
+
+        Example:
+            >>> _build_sequence_set([9, 7, 6, 5, 3, 1])
+            '1,3,5:7,9'
+        """
+        ranges = []
+        start = end = None
+        for uid in sorted(uids):
+            if end is not None and uid <= end + 1:
+                end = max(end, uid)
+                continue
+            if start is not None:
+                ranges.append(str(start) if start == end else f"{start}:{end}")
+            start = end = uid
+        if start is not None:
+            ranges.append(str(start) if start == end else f"{start}:{end}")
+        return ",".join(ranges)
+
+    @staticmethod
+    def _compact_sequence_set(sequence_set: str) -> str:
+        """
+        Merge overlapping and consecutive ranges of `sequence_set`,
+        so the server gets the same emails in the fewest ranges.
+        Sets that contain `*` or can not be parsed are returned as
+        they are.
+
+        Example:
+            >>> _compact_sequence_set("1,3,4,5,7,8,9")
+            '1,3:5,7:9'
+            >>> _compact_sequence_set("5:*,1")
+            '5:*,1'
+        """
+        if "*" in sequence_set:
+            return sequence_set
+
+        intervals = IMAPManager._parse_sequence_set(sequence_set)
+        if not intervals:
+            return sequence_set
+
+        ranges = []
+        start = end = None
+        for interval_start, interval_end in sorted(intervals):
+            if end is not None and interval_start <= end + 1:
+                end = max(end, interval_end)
+                continue
+            if start is not None:
+                ranges.append(str(start) if start == end else f"{start}:{end}")
+            start, end = interval_start, interval_end
+        if start is not None:
+            ranges.append(str(start) if start == end else f"{start}:{end}")
+        return ",".join(ranges)
 
     def _resolve_offsets(self,
         offset_start: int | None = None,
@@ -1727,14 +2355,19 @@ class IMAPManager(imaplib.IMAP4_SSL):
         messages = []
         emails = []
         try:
-            sequence_set = ",".join(
-                map(str, self._searched_emails.uids[offset_start:offset_end][::-1])
-            )
+            page_uids = self._searched_emails.uids[offset_start:offset_end]
+            sequence_set = self._build_sequence_set(page_uids)
+            # Text of most emails is in their first part, so it is
+            # requested in the same FETCH as the headers, before knowing
+            # their body structures. Only the emails whose text is in
+            # another part need a second round trip.
             status, messages = self.uid(
                 "FETCH",
                 sequence_set,
                 "(BODY.PEEK[HEADER.FIELDS (FROM TO SUBJECT DATE CC BCC MESSAGE-ID "
                 "IN-REPLY-TO REFERENCES LIST-UNSUBSCRIBE LIST-UNSUBSCRIBE-POST)] "
+                f"BODY.PEEK[{SPECULATIVE_BODY_PART}]<0.{SHORT_BODY_TEXT_CHUNK_SIZE}> "
+                f"BODY.PEEK[{SPECULATIVE_BODY_PART}.MIME] "
                 "FLAGS BODYSTRUCTURE)",
             )
 
@@ -1752,13 +2385,22 @@ class IMAPManager(imaplib.IMAP4_SSL):
             `fetchs` will be something like this:
             {"1.1": ["1234", "1235", "1236"], "1.1.1": ["1250", "1251"], "2": ["1300"]}
             which can be use to create fetch requests like this instead of one by one:
-            C: "A101 FETCH 1234, 1235, 1236 (BODY.PEEK[1.1] BODY.PEEK[1.1.MIME])"
-            S: ...
-            C: "A102 FETCH 1250, 1251 (BODY.PEEK[1.1.1] BODY.PEEK[1.1.1.MIME])"
-            S: ...
-            C: "A103 FETCH 1300 (BODY.PEEK[2] BODY.PEEK[2.MIME])
+            C: "A101 FETCH 1234, 1235, 1236 (BODY.PEEK[1.1]<0.4096> BODY.PEEK[1.1.MIME])"
+            C: "A102 FETCH 1250, 1251 (BODY.PEEK[1.1.1]<0.4096> BODY.PEEK[1.1.1.MIME])"
+            C: "A103 FETCH 1300 (BODY.PEEK[2]<0.4096> BODY.PEEK[2.MIME])
             S: ...
+            Only the first `SHORT_BODY_TEXT_CHUNK_SIZE` bytes of the text parts
+            are fetched since the body is only used as a preview here.
             """
+            def set_body(uid: str, body_part: tuple[bytes, str, str]) -> None:
+                body, content_type, encoding = body_part
+                emails[email_uid_map[uid]].body = MessageDecoder.body(
+                    body,
+                    encoding=encoding,
+                    sanitize="html" not in content_type,
+                    parse="html" in content_type
+                )
+
             email_uid_map = {}
             for index, grouped_message in enumerate(grouped_messages):
                 uid = MessageParser.get_uid(grouped_message)
@@ -1788,32 +2430,52 @@ class IMAPManager(imaplib.IMAP4_SSL):
                     "1"
                 )
 
+                if body_part == SPECULATIVE_BODY_PART:
+                    speculative_body_part = MessageParser.get_body_part(grouped_message, body_part)
+                    if speculative_body_part:
+                        set_body(uid, speculative_body_part)
+                        continue
+
                 if body_part in fetchs:
                     fetchs[body_part].append(uid)
                 else:
                     fetchs[body_part] = [uid]
 
             messages.clear()
-            for body_part, uids in fetchs.items():
-                uids = sorted(uids, key=int)
-                status, bodies = self.uid(
+            for uids in fetchs.values():
+                uids.sort(key=int)
+
+            # Bodies of every other part group are requested at once. Server
+            # may run the fetches concurrently and their untagged responses
+            # may be collected by any of the tags, so responses of all of
+            # them are pooled and matched by their uid and section.
+            body_part_by_uid = {
+                uid: body_part for body_part, uids in fetchs.items() for uid in uids
+            }
+            results = self._pipeline(*[
+                (
+                    "UID",
                     "FETCH",
-                    ",".join(uids),
-                    f"(BODY.PEEK[{body_part}] BODY.PEEK[{body_part}.MIME])",
+                    self._build_sequence_set(map(int, uids)),
+                    f"(BODY.PEEK[{body_part}]<0.{SHORT_BODY_TEXT_CHUNK_SIZE}> "
+                    f"BODY.PEEK[{body_part}.MIME])",
                 )
+                for body_part, uids in fetchs.items()
+            ]) if fetchs else []
+            bodies = []
+            for uids, (status, result) in zip(fetchs.values(), results):
                 if status != "OK":
-                    print(f"Could not found bodies in emails {uids}")
+                    logger.warning("Could not found bodies in emails %s", uids)
                     continue
+                bodies.extend(result)
 
-                body_group_messages = MessageParser.group_messages(bodies)
-                for index, body_grouped_message in enumerate(body_group_messages):
-                    content_type, encoding = MessageParser.get_content_type_and_encoding(body_grouped_message)
-                    emails[email_uid_map[uids[index]]].body = MessageDecoder.body(
-                        MessageParser.get_body(body_grouped_message),
-                        encoding=encoding,
-                        sanitize="html" not in content_type,
-                        parse="html" in content_type
-                    )
+            for body_grouped_message in MessageParser.group_messages(bodies):
+                uid = MessageParser.get_uid(body_grouped_message)
+                if uid not in body_part_by_uid:
+                    continue
+                body_part = MessageParser.get_body_part(body_grouped_message, body_part_by_uid[uid])
+                if body_part:
+                    set_body(uid, body_part)
         except Exception as e:
             fetched_email_count = len(emails)
             raise IMAPManagerException(
@@ -1826,6 +2488,25 @@ class IMAPManager(imaplib.IMAP4_SSL):
             folder=self._searched_emails.folder, emails=emails, total=self._searched_emails.count
         )
 
+    def add_new_message_listener(self, listener: Callable[[], None]) -> None:
+        """
+        Register a callback that is called whenever the server pushes an
+        `EXISTS` response for a new message while idling. Lets callers react
+        immediately instead of polling `any_new_email`.
+
+        Args:
+            listener (Callable[[], None]): Called on the readline thread, so
+            it should return quickly and must not issue IMAP commands.
+
+        Notes:
+            - Only works if the instance is created with `listen_new_messages=True`.
+        """
+        self._new_message_listeners.add(listener)
+
+    def remove_new_message_listener(self, listener: Callable[[], None]) -> None:
+        """Unregister a callback registered with `add_new_message_listener`."""
+        self._new_message_listeners.discard(listener)
+
     def any_new_email(self) -> bool:
         """
         Checks if there are any new emails by verifying if new message timestamps
@@ -1848,6 +2529,23 @@ class IMAPManager(imaplib.IMAP4_SSL):
             >>> get_recent_emails()
             [Email(uid="2", sender="b@gmail.com", ...), Email(uid="3", sender="c@gmail.com", ...)]
         """
+        def is_received_after_search_start(email: Email) -> bool:
+            """
+            Check if the email is received after `search_start_time`. Emails
+            with malformed `Date` headers are kept instead of failing the whole
+            request since they are already matched by the `SINCE` search.
+            """
+            try:
+                # email.date must conform to the syntax defined in RFC 5322, Section 3.3
+                # https://datatracker.ietf.org/doc/html/rfc5322#autoid-23
+                return (
+                    parsedate_to_datetime(email.date).astimezone(ZoneInfo("UTC"))
+                    >= search_start_time
+                )
+            except (TypeError, ValueError) as e:
+                print(f"Date `{email.date}` of email `{email.uid}` could not parsed: {str(e)}")
+                return True
+
         search_start_time = min(self._new_message_timestamps)
         self.search_emails(
             Folder.Inbox,
@@ -1861,20 +2559,11 @@ class IMAPManager(imaplib.IMAP4_SSL):
         )
         mailbox = self.get_emails()
         if mailbox.total > 0:
-            try:
-                # email.date must conform to the syntax defined in RFC 5322, Section 3.3
-                # https://datatracker.ietf.org/doc/html/rfc5322#autoid-23
-                mailbox.emails = [
-                    email
-                    for email in mailbox.emails
-                    if parsedate_to_datetime(email.date).astimezone(ZoneInfo("UTC"))
-                    >= search_start_time
-                ]
-            except Exception as e:
-                del mailbox
-                raise IMAPManagerException(
-                    "Error, recent emails fetched but dates could not parsed!"
-                ) from e
+            mailbox.emails = [
+                email
+                for email in mailbox.emails
+                if is_received_after_search_start(email)
+            ]
 
         self._new_message_timestamps = []
         return mailbox.emails
@@ -1903,9 +2592,59 @@ class IMAPManager(imaplib.IMAP4_SSL):
             - Marks the email as "Seen" if it is not already and if an error
             occurs while marking the email, the mark operation will be skipped
             without raising an error but it will be logged as a warning.
+            - Last `EMAIL_CONTENT_CACHE_SIZE` emails are cached by their folder,
+            uid and the UIDVALIDITY of the folder, so only flags are fetched
+            when the same email is requested again.
         """
-        self.select(folder, readonly=True)
+        # Not readonly, since the email will be marked as seen.
+        self.select(folder)
+
+        cache_key = (folder, self._selected_uidvalidity, uid)
+        cached_email = self._email_content_cache.get(cache_key)
+        if cached_email:
+            # Content of an email can not change without its uid changing,
+            # only its flags has to be fetched again.
+            self._email_content_cache.move_to_end(cache_key)
+            status, message = self.uid("FETCH", uid, "(FLAGS)")
+            if status != "OK" or not message or not message[0]:
+                raise IMAPManagerException(
+                    f"Error while getting email `{uid}`'s flags in folder `{folder}`: `{status}`"
+                )
+            email = replace(
+                cached_email,
+                flags=MessageParser.get_flags(MessageParser.group_messages(message)[0]),
+                attachments=list(cached_email.attachments),
+            )
+        else:
+            email = self._fetch_email_content(folder, uid)
+            if self._selected_uidvalidity:
+                self._email_content_cache[cache_key] = replace(
+                    email, flags=[], attachments=list(email.attachments)
+                )
+                if len(self._email_content_cache) > EMAIL_CONTENT_CACHE_SIZE:
+                    self._email_content_cache.popitem(last=False)
+
+        # Everything is fetched with BODY.PEEK, which never sets \Seen,
+        # so the email is marked explicitly, only if the flags fetched
+        # with the headers show that it is not seen yet.
+        if Mark.Seen not in email.flags:
+            try:
+                status, _ = self.uid("STORE", uid, "+FLAGS.SILENT", Mark.Seen)
+                if status == "OK":
+                    email.flags.append(Mark.Seen)
+                else:
+                    print(f"Email `{uid}` in folder `{folder}` could not marked as seen: `{status}`")
+            except Exception as e:
+                print(f"An error occurred while marking email `{uid}` in folder `{folder}` as seen: `{str(e)}`")
 
+        return email
+
+    def _fetch_email_content(self, folder: str, uid: str) -> Email:
+        """
+        Fetch headers, flags, body and attachments of the email from the
+        selected folder. Used by `get_email_content` when the email is not
+        cached.
+        """
         # Get body and attachments
         body = ""
         inline_attachments = []
@@ -1959,17 +2698,25 @@ class IMAPManager(imaplib.IMAP4_SSL):
                     encoding=encoding
                 )
                 try:
+                    types_by_cid = {}
+                    for inline_attachment in inline_attachments:
+                        types_by_cid.setdefault(inline_attachment.cid, inline_attachment.type)
+
+                    data_urls_by_cid = {}
                     for cid, data in MessageParser.get_cid_and_data_of_inline_attachments(body_grouped_message):
-                        i = 0
-                        while i < len(inline_attachments):
-                            if inline_attachments[i].cid == cid:
-                                body = body.replace(
-                                    f"cid:{inline_attachments[i].cid}",
-                                    f"data:{inline_attachments[i].type};base64,{data}",
-                                )
-                                del inline_attachments[i]
-                            else:
-                                i += 1
+                        if cid in types_by_cid and cid not in data_urls_by_cid:
+                            data_urls_by_cid[cid] = f"data:{types_by_cid[cid]};base64,{data}"
+
+                    # Every cid is replaced in a single pass over the body
+                    # instead of scanning the whole body once per cid.
+                    if data_urls_by_cid:
+                        cid_pattern = re.compile("cid:(" + "|".join(
+                            re.escape(cid)
+                            for cid in sorted(data_urls_by_cid, key=len, reverse=True)
+                        ) + ")")
+                        body = cid_pattern.sub(
+                            lambda match: data_urls_by_cid[match.group(1)], body
+                        )
                 except Exception as e:
                     # If there is a problem with inline attachments
                     # just ignore them.
@@ -2025,6 +2772,14 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
         References:
             https://datatracker.ietf.org/doc/html/rfc9051#name-formal-syntax (check sequence-set for more information.)
+            https://datatracker.ietf.org/doc/html/rfc7162#section-3.1.4
+
+        Notes:
+            - If the server supports CONDSTORE, flags of the last
+            `EMAIL_FLAGS_CACHE_SIZE` sequence sets are cached and only the
+            flags that are changed since then are fetched with CHANGEDSINCE.
+            Since CHANGEDSINCE does not report expunged emails, uids of the
+            cached set are revalidated with `UID SEARCH` in the same round trip.
         """
         if self.state != "SELECTED":
             # Since uid's are unique within each mailbox, we can't just select INBOX
@@ -2033,29 +2788,68 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 "Folder should be selected before fetching flags."
             )
 
-        status, message = self.uid("FETCH", sequence_set, "(FLAGS)")
+        is_condstore_supported = (
+            self.is_supported("CONDSTORE")
+            and bool(self._selected_folder)
+            and bool(self._selected_uidvalidity)
+        )
+        cache_key = (self._selected_folder, self._selected_uidvalidity, sequence_set)
+        cached_flags = self._email_flags_cache.get(cache_key) if is_condstore_supported else None
+
+        if cached_flags:
+            # Only the flags that are changed since the last fetch are
+            # returned by the server.
+            modseq, flags_by_uid = cached_flags
+            self._email_flags_cache.move_to_end(cache_key)
+            (status, message), (search_status, search_data) = self._pipeline(
+                ("UID", "FETCH", sequence_set, "(FLAGS)", f"(CHANGEDSINCE {modseq})"),
+                ("UID", "SEARCH", "UID", sequence_set),
+            )
+            if search_status != "OK":
+                del self._email_flags_cache[cache_key]
+                raise IMAPManagerException(
+                    f"Error while fetching flags of email `{sequence_set}`: `{search_status}`"
+                )
+
+            # Emails expunged by other clients since the last fetch.
+            existing_uids = set(b" ".join(filter(None, search_data)).decode().split())
+            flags_by_uid = {
+                uid: flags for uid, flags in flags_by_uid.items() if uid in existing_uids
+            }
+        elif is_condstore_supported:
+            modseq, flags_by_uid = 0, {}
+            status, message = self.uid("FETCH", sequence_set, "(FLAGS MODSEQ)")
+        else:
+            modseq, flags_by_uid = 0, {}
+            status, message = self.uid("FETCH", sequence_set, "(FLAGS)")
 
         try:
-            flags_list = []
             if status != "OK":
                 raise IMAPManagerException(
                     f"Error while fetching flags of email `{sequence_set}`: `{status}`"
                 )
 
-            grouped_messages = MessageParser.group_messages(message)
-            for grouped_message in grouped_messages:
-                flags_list.append(
-                    Flags(
-                        uid=MessageParser.get_uid(grouped_message),
-                        flags=MessageParser.get_flags(grouped_message),
-                    )
-                )
+            # Every untagged FETCH response is a message on its own.
+            for part in message:
+                if not part:
+                    continue
+                for grouped_message in MessageParser.group_messages([part]):
+                    uid = MessageParser.get_uid(grouped_message)
+                    if not uid:
+                        continue
+                    flags_by_uid[uid] = MessageParser.get_flags(grouped_message)
+                    modseq = max(modseq, MessageParser.get_modseq(grouped_message))
         except Exception as e:
             raise IMAPManagerException(
                 f"Error while fetching flags of email `{sequence_set}`: `{e}`"
             ) from e
 
-        return flags_list or []
+        if is_condstore_supported and modseq:
+            self._email_flags_cache[cache_key] = (modseq, flags_by_uid)
+            if len(self._email_flags_cache) > EMAIL_FLAGS_CACHE_SIZE:
+                self._email_flags_cache.popitem(last=False)
+
+        return [Flags(uid=uid, flags=list(flags)) for uid, flags in flags_by_uid.items()]
 
     @handle_idle
     def get_email_size(self, folder: str, uid: str) -> int | None:
@@ -2107,58 +2901,71 @@ class IMAPManager(imaplib.IMAP4_SSL):
             >>> attachment = download_attachment("1", "INBOX", "example.pdf")
             >>> print(attachment.name)
             'example.pdf'
+
+        Notes:
+            - Body structures of the last `BODYSTRUCTURE_CACHE_SIZE` emails
+            are cached by their folder, uid and the UIDVALIDITY of the folder,
+            so downloading from the same email again takes a single fetch.
         """
         self.select(folder, readonly=True)
 
-        status, message = self.uid("FETCH", uid, "(BODYSTRUCTURE)")
-        if status != "OK":
-            raise IMAPManagerException(
-                f"Error while fetching body structure of the `{uid}` email in folder `{folder}`: `{status}`"
-            )
+        # Body structure of an email can not change without its uid
+        # changing, so it is fetched only once per email.
+        cache_key = (folder, self._selected_uidvalidity, uid)
+        message = self._bodystructure_cache.get(cache_key)
+        if message:
+            self._bodystructure_cache.move_to_end(cache_key)
+        else:
+            status, message = self.uid("FETCH", uid, "(BODYSTRUCTURE)")
+            if status != "OK":
+                raise IMAPManagerException(
+                    f"Error while fetching body structure of the `{uid}` email in folder `{folder}`: `{status}`"
+                )
 
-        if not message or not message[0]:
-            raise ValueError(
-                f"No attachment found in `{uid}` uid in `{folder}` folder with given `{name}` and `{cid}` cid."
-            )
+            if not message or not message[0]:
+                raise ValueError(
+                    f"No attachment found in `{uid}` uid in `{folder}` folder with given `{name}` and `{cid}` cid."
+                )
+
+            if self._selected_uidvalidity:
+                self._bodystructure_cache[cache_key] = message
+                if len(self._bodystructure_cache) > BODYSTRUCTURE_CACHE_SIZE:
+                    self._bodystructure_cache.popitem(last=False)
 
         grouped_message = MessageParser.group_messages(message)[0]
-        attachment_list = MessageParser.get_attachment_list(grouped_message)
-        target_attachment = [
-            attachment for attachment in attachment_list if attachment[0] == name
-        ][0]
-        target_attachment = Attachment(
-            name=target_attachment[0],
-            size=target_attachment[1],
-            cid=target_attachment[2],
-            type=target_attachment[3],
+        found_attachment = MessageParser.get_attachment_by_name(
+            grouped_message, name, cid
         )
-
-        try:
-            target_part = MessageParser.get_part(
-                grouped_message, ["FILENAME", '"' + name + '"', cid]
+        if not found_attachment:
+            raise IMAPManagerException(
+                "Error, target attachment could not found in the email body."
             )
-            if not target_part:
-                raise IMAPManagerException(
-                    "Error, target attachment could not found in the email body."
-                )
 
-            status, message = self.uid("FETCH", uid, f"(BODY[{target_part}])")
-            if status != "OK":
-                raise IMAPManagerException(
-                    f"Error while fetching attachment part of the `{uid}` email in folder `{folder}`: `{status}`"
-                )
+        (attachment_name, size, attachment_cid, mimetype), target_part = found_attachment
+        target_attachment = Attachment(
+            name=attachment_name,
+            size=size,
+            cid=attachment_cid,
+            type=mimetype,
+        )
 
-            body_grouped_message = MessageParser.group_messages(message)[0]
-            content_type, encoding = MessageParser.get_content_type_and_encoding(body_grouped_message)
-            target_attachment.data = MessageDecoder.body(
-                MessageParser.get_body(body_grouped_message),
-                encoding=encoding,
-            )
-        except:
+        # Errors of `uid` are already raised as IMAPManagerException.
+        status, message = self.uid("FETCH", uid, f"(BODY[{target_part}])")
+        if status != "OK":
             raise IMAPManagerException(
                 f"Error while fetching attachment part of the `{uid}` email in folder `{folder}`: `{status}`"
             )
 
+        if not message or not isinstance(message[0], tuple):
+            raise IMAPManagerException(
+                "Error, target attachment could not found in the email body."
+            )
+
+        # `BODY[part]` contains no MIME headers, so the payload is
+        # returned as it is transferred (base64 for binary attachments)
+        # without scanning it for headers or decoding it twice.
+        target_attachment.data = message[0][1].decode(errors="replace")
+
         return target_attachment
 
     @handle_idle
@@ -2179,9 +2986,9 @@ class IMAPManager(imaplib.IMAP4_SSL):
         if appenduid:
             self.delete_email(Folder.Drafts, appenduid)
 
+        # APPEND does not require the mailbox to be selected, so
+        # there is no need to SELECT drafts after deleting the old one.
         draft_mailbox_name = self.find_matching_folder(Folder.Drafts)
-        self.select(draft_mailbox_name)
-
         status, data = self.append(
             draft_mailbox_name,
             "",
@@ -2222,18 +3029,27 @@ class IMAPManager(imaplib.IMAP4_SSL):
                 - A string containing a success message or an error message.
         """
         self.select(folder)
+        sequence_set = self._compact_sequence_set(sequence_set)
 
         if not mark:
             raise IMAPManagerException("`mark` cannot be empty.")
 
-        mark_result = self._parse_command_result(
-            self.uid("STORE", sequence_set, command, mark), success_msg, err_msg
-        )
+        # Only deleted emails are affected by EXPUNGE, there
+        # is nothing to expunge after setting any other flag.
+        if not (command == "+FLAGS" and str(mark).lower() == Mark.Deleted.lower()):
+            return self._parse_command_result(
+                self.uid("STORE", sequence_set, command, mark), success_msg, err_msg
+            )
 
-        if mark_result[0]:
-            return self._parse_command_result(self.expunge(), success_msg, err_msg)
+        # Expunged emails are not reported by CHANGEDSINCE.
+        self._email_flags_cache.clear()
 
-        return mark_result
+        return self._store_and_expunge(
+            sequence_set,
+            ("UID", "STORE", sequence_set, command, mark),
+            success_msg,
+            err_msg,
+        )
 
     def mark_email(
         self, sequence_set: str, mark: str | Mark, folder: str = Folder.Inbox
@@ -2354,17 +3170,159 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
         succes_msg = f"Email(s) `{sequence_set}` moved successfully from `{source_folder}` to `{destination_folder}`."
         err_msg = f"Failed to move email(s) `{sequence_set}` from `{source_folder}` to `{destination_folder}`."
+        sequence_set = self._compact_sequence_set(sequence_set)
+
+        # Expunged emails are not reported by CHANGEDSINCE.
+        self._email_flags_cache.clear()
+
+        if self.is_supported("MOVE"):
+            # MOVE expunges the moved emails from the source folder
+            # itself, see RFC 6851.
+            return self._parse_command_result(
+                self.uid("MOVE", sequence_set, self._encode_folder(destination_folder)),
+                succes_msg,
+                err_msg,
+            )
+
+        copy_result = self._parse_command_result(
+            self.uid("COPY", sequence_set, self._encode_folder(destination_folder)),
+            succes_msg,
+            err_msg,
+        )
+        if not copy_result[0]:
+            # Emails must not be deleted if they could not be copied.
+            return copy_result
 
-        move_result = self._parse_command_result(
-            self.uid("MOVE", sequence_set, self._encode_folder(destination_folder)),
+        return self._store_and_expunge(
+            sequence_set,
+            ("UID", "STORE", sequence_set, "+FLAGS.SILENT", "\\Deleted"),
             succes_msg,
             err_msg,
         )
 
-        if move_result[0]:
-            return self._parse_command_result(self.expunge(), succes_msg, err_msg)
+    def _expunge_command(self, sequence_set: str) -> tuple[str, ...]:
+        """
+        Get the command that expunges the deleted emails of `sequence_set`.
+        With UIDPLUS (RFC 4315) only those emails are expunged. Otherwise
+        the plain EXPUNGE removes every email marked as deleted in the
+        selected folder, not just `sequence_set`, so it must only be sent
+        after the STORE of `\\Deleted` succeeded, never pipelined behind it.
+        """
+        if self.is_supported("UIDPLUS"):
+            return ("UID", "EXPUNGE", sequence_set)
+        return ("EXPUNGE",)
 
-        return move_result
+    def _store_and_expunge(
+        self,
+        sequence_set: str,
+        store_command: tuple[str, ...],
+        success_msg: str,
+        err_msg: str,
+    ) -> IMAPCommandResult:
+        """
+        Run `store_command`, which marks the emails of `sequence_set` in
+        the selected folder as deleted, then expunge them. Inside `batch`,
+        expunge is deferred to `flush`.
+
+        With UIDPLUS, `UID EXPUNGE` only touches `sequence_set`, so it is
+        pipelined with the STORE. Otherwise the plain EXPUNGE would remove
+        every deleted email of the folder even if the STORE fails, so it
+        is only sent after the STORE succeeds.
+        """
+        pending = getattr(self._batch_local, "pending", None)
+        if pending is not None:
+            store_result = self._parse_command_result(
+                self.uid(*store_command[1:]), success_msg, err_msg
+            )
+            if store_result[0]:
+                # Selected folder is already normalized by `select`, so
+                # every folder is expunged once.
+                pending.setdefault(self._selected_folder, []).append(sequence_set)
+            return store_result
+
+        if not self.is_supported("UIDPLUS"):
+            store_result = self._parse_command_result(
+                self.uid(*store_command[1:]), success_msg, err_msg
+            )
+            if not store_result[0]:
+                return store_result
+
+            return self._parse_command_result(self.expunge(), success_msg, err_msg)
+
+        store_result, expunge_result = self._pipeline(
+            store_command,
+            self._expunge_command(sequence_set),
+        )
+        store_result = self._parse_command_result(store_result, success_msg, err_msg)
+
+        if store_result[0]:
+            return self._parse_command_result(expunge_result, success_msg, err_msg)
+
+        return store_result
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Defer the expunges of `mark_email`, `move_email`, `delete_email`
+        etc. called from the current thread until the end of the block,
+        then expunge every affected folder once with `flush`. If the block
+        raises, the emails whose flags are already stored are still
+        expunged and the original exception is raised.
+
+        Example:
+            >>> with imap.batch():
+            ...     for uid in uids:
+            ...         imap.delete_email(Folder.Inbox, uid)
+        """
+        if getattr(self._batch_local, "pending", None) is not None:
+            yield
+            return
+
+        self._batch_local.pending = {}
+        try:
+            yield
+        except BaseException:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning("Deferred expunges could not be flushed: %s", e)
+            raise
+        else:
+            self.flush()
+        finally:
+            self._batch_local.pending = None
+
+    @handle_idle
+    def flush(self) -> None:
+        """
+        Expunge the emails whose expunge is deferred by `batch` in the
+        current thread, with one EXPUNGE per folder.
+
+        Raises:
+            IMAPManagerException: If the emails of a folder could not be
+            expunged. Other folders are still expunged.
+        """
+        pending = getattr(self._batch_local, "pending", None)
+        if not pending:
+            return
+
+        # Expunged emails are not reported by CHANGEDSINCE.
+        self._email_flags_cache.clear()
+
+        failed_folders = []
+        while pending:
+            folder, sequence_sets = pending.popitem()
+            self.select(folder)
+            (status, _), = self._pipeline(
+                self._expunge_command(self._compact_sequence_set(",".join(sequence_sets)))
+            )
+            if status != "OK":
+                failed_folders.append(folder)
+
+        if failed_folders:
+            raise IMAPManagerException(
+                f"Error while expunging deleted emails in folder(s) `{failed_folders}`."
+            )
 
     @handle_idle
     def copy_email(
@@ -2403,18 +3361,14 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
         succes_message = f"Email(s) `{sequence_set}` copied successfully from `{source_folder}` to `{destination_folder}`."
         err_msg = f"Failed to copy email(s) `{sequence_set}` from `{source_folder}` to `{destination_folder}`."
+        sequence_set = self._compact_sequence_set(sequence_set)
 
-        copy_result = self._parse_command_result(
+        return self._parse_command_result(
             self.uid("COPY", sequence_set, self._encode_folder(destination_folder)),
             succes_message,
             err_msg,
         )
 
-        if copy_result[0]:
-            return self._parse_command_result(self.expunge(), succes_message, err_msg)
-
-        return copy_result
-
     @handle_idle
     def delete_email(self, folder: str, sequence_set: str) -> IMAPCommandResult:
         """
@@ -2459,15 +3413,17 @@ class IMAPManager(imaplib.IMAP4_SSL):
 
         success_msg = f"Email(s) `{sequence_set}` deleted from `{folder}` successfully."
         err_msg = f"There was an error while deleting the email(s) `{sequence_set}` from `{folder}`."
+        sequence_set = self._compact_sequence_set(sequence_set)
 
-        delete_result = self._parse_command_result(
-            self.uid("STORE", sequence_set, "+FLAGS", "\\Deleted"), success_msg, err_msg
-        )
+        # Expunged emails are not reported by CHANGEDSINCE.
+        self._email_flags_cache.clear()
 
-        if delete_result[0]:
-            return self._parse_command_result(self.expunge(), success_msg, err_msg)
-
-        return delete_result
+        return self._store_and_expunge(
+            sequence_set,
+            ("UID", "STORE", sequence_set, "+FLAGS", "\\Deleted"),
+            success_msg,
+            err_msg,
+        )
 
     @handle_idle
     def create_folder(
@@ -2497,13 +3453,21 @@ class IMAPManager(imaplib.IMAP4_SSL):
         self._check_folder_names(folder_name, parent_folder)
 
         if parent_folder:
-            if parent_folder not in self.get_folders():
-                self.create_folder(parent_folder)
-
             folder_name = f"{parent_folder}{self._hierarchy_delimiter}{folder_name}"
 
+        if parent_folder and parent_folder not in self.get_folders():
+            # Server runs the pipelined CREATEs in the order they are sent,
+            # so the parent folder exists when the folder is created.
+            self._clear_folder_caches()
+            _, result = self._pipeline(
+                ("CREATE", self._encode_folder(parent_folder)),
+                ("CREATE", self._encode_folder(folder_name)),
+            )
+        else:
+            result = self.create(self._encode_folder(folder_name))
+
         return self._parse_command_result(
-            self.create(self._encode_folder(folder_name)),
+            result,
             f"Folder `{folder_name}` created successfully.",
             f"There was an error while creating folder `{folder_name}`.",
         )
@@ -2534,11 +3498,28 @@ class IMAPManager(imaplib.IMAP4_SSL):
         self._check_folder_names(folder_name)
 
         if delete_subfolders:
-            for subfolder in self.get_folders(folder_name):
-                self.delete_folder(subfolder, True)
+            # Subfolders are listed once and deleted starting from the
+            # deepest one, instead of listing them again on every level.
+            # Server runs the pipelined DELETEs in the order they are sent,
+            # so the folder itself is deleted after all of its subfolders.
+            subfolders = self.get_folders(folder_name)
+            subfolders.sort(
+                key=lambda subfolder: subfolder.count(self._hierarchy_delimiter),
+                reverse=True,
+            )
+            self._clear_folder_caches()
+            self._clear_selected_folder()
+            *_, result = self._pipeline(
+                *(
+                    ("DELETE", self._encode_folder(folder))
+                    for folder in [*subfolders, folder_name]
+                )
+            )
+        else:
+            result = self.delete(self._encode_folder(folder_name))
 
         return self._parse_command_result(
-            self.delete(self._encode_folder(folder_name)),
+            result,
             f"Folder `{folder_name}` deleted successfully.",
             f"There was an error while deleting folder `{folder_name}`.",
         )
@@ -2576,10 +3557,12 @@ class IMAPManager(imaplib.IMAP4_SSL):
             self._check_folder_names(destination_folder)
             destination_folder += self._hierarchy_delimiter
 
-        *folder_name_parent, folder_name_target = folder_name.split(
+        folder_name_parent, _, folder_name_target = folder_name.rpartition(
             self._hierarchy_delimiter
         )
-        if self._hierarchy_delimiter.join(folder_name_parent) in self.get_folders():
+        # Top level folders have no parent to look up in the (cached)
+        # folder list, both branches would give the same destination.
+        if folder_name_parent and folder_name_parent in self.get_folders():
             destination_folder = f"{destination_folder}{folder_name_target}"
         else:
             destination_folder = f"{destination_folder}{folder_name}"
@@ -2619,9 +3602,8 @@ class IMAPManager(imaplib.IMAP4_SSL):
         """
         self._check_folder_names(folder_name, new_folder_name)
 
-        *folder_name_parent, _ = folder_name.split(self._hierarchy_delimiter)
-        folder_name_parent = self._hierarchy_delimiter.join(folder_name_parent)
-        if folder_name_parent in self.get_folders():
+        folder_name_parent, _, _ = folder_name.rpartition(self._hierarchy_delimiter)
+        if folder_name_parent and folder_name_parent in self.get_folders():
             new_folder_name = (
                 f"{folder_name_parent}{self._hierarchy_delimiter}{new_folder_name}"
             )
@@ -13,6 +13,7 @@ from __future__ import annotations
 import base64
 import re
 import quopri
+import html
 from typing import NotRequired, TypedDict, Any
 from email.header import decode_header
 from html.parser import HTMLParser as BuiltInHTMLParser
@@ -28,6 +29,7 @@ SIZE_PATTERN = re.compile(rb"RFC822\.SIZE (\d+)")
 DATA_SIZE_PATTERN = re.compile(rb"\{(\d+)\}$")
 EXISTS_SIZE_PATTERN = re.compile(rb'\* (\d+) EXISTS')
 FLAGS_PATTERN = re.compile(rb'FLAGS \((.*?)\)', re.DOTALL | re.IGNORECASE)
+MODSEQ_PATTERN = re.compile(rb'MODSEQ \((\d+)\)', re.IGNORECASE)
 BODYSTRUCTURE_PATTERN = re.compile(r"BODYSTRUCTURE\s+(.*)", re.DOTALL | re.IGNORECASE)
 HIERARCHY_DELIMITER_PATTERN = re.compile(rb'\(""\s*"(.?)"\)')
 ATTACHMENT_LIST_PATTERN = re.compile(
@@ -42,6 +44,7 @@ INLINE_ATTACHMENT_LIST_PATTERN = re.compile(
     r'"([^"]+)"\)\)\s+[^\s"]+\)',
     re.DOTALL | re.IGNORECASE
 )
+FILENAME_PATTERN = re.compile(r'\("FILENAME"\s+"([^"]*)"\)', re.IGNORECASE)
 
 """
 Header Constants
@@ -62,24 +65,27 @@ class MessageHeaders(TypedDict):
     list_unsubscribe: NotRequired[str]
     list_unsubscribe_post: NotRequired[str]
 
-MESSAGE_HEADER_PATTERN_MAP = {
-    "subject": re.compile(rb'Subject:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "sender": re.compile(rb'From:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "receivers": re.compile(rb'To:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "date": re.compile(rb'Date:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "cc": re.compile(rb'Cc:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "bcc": re.compile(rb'Bcc:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "message_id": re.compile(rb'Message-ID:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "in_reply_to": re.compile(rb'In-Reply-To:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "references": re.compile(rb'References:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "list_unsubscribe": re.compile(rb'List-Unsubscribe:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE),
-    "list_unsubscribe_post": re.compile(rb'List-Unsubscribe-Post:\s+(.*?)(?:\r\n[A-Za-z\-]+:|\r\n\r\n)', re.DOTALL | re.IGNORECASE)
+# {lowercase header field name: key in MessageHeaders}
+MESSAGE_HEADER_FIELD_MAP = {
+    b"subject": "subject",
+    b"from": "sender",
+    b"to": "receivers",
+    b"date": "date",
+    b"cc": "cc",
+    b"bcc": "bcc",
+    b"message-id": "message_id",
+    b"in-reply-to": "in_reply_to",
+    b"references": "references",
+    b"list-unsubscribe": "list_unsubscribe",
+    b"list-unsubscribe-post": "list_unsubscribe_post"
 }
 
 """
 Body Constants
 """
 BODY_PATTERN = re.compile(rb"BODY\[.*?{\d+}", re.DOTALL | re.IGNORECASE)
+# Section of the literal that follows, e.g. `BODY[1.MIME] {90}`, `BODY[1]<0> {4096}`
+BODY_SECTION_PATTERN = re.compile(rb"BODY\[([^\]]*)\](?:<\d+>)?\s*{\d+}$", re.IGNORECASE)
 CONTENT_TYPE_PATTERN = re.compile(
     rb'(?:(?:^|\r\n)Content-Type:\s*([\w\/\-]+))', re.DOTALL | re.IGNORECASE
 )
@@ -96,11 +102,12 @@ Util Constants
 """
 LINE_PATTERN = re.compile(r'\r\n')
 TAG_PATTERN = re.compile(r'<[^>]+>')
+SCRIPT_AND_STYLE_PATTERN = re.compile(r'<(script|style)\b.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+UNCLOSED_TAG_PATTERN = re.compile(r'<[^>]*$')
 TAG_CLEANING_PATTERN = re.compile(r'^<|>$')
 SPECIAL_CHAR_PATTERN = re.compile(r'[+\-*/\\|=<>\(]')
 LINK_PATTERN = re.compile(r'https?://[^\s]+|\([^\)]+\)', re.DOTALL)
 BRACKET_PATTERN = re.compile(r'\[.*?\]')
-SPACE_PATTERN = re.compile(r'\s+')
 SRC_PATTERN = re.compile(r'(<img\s+[^>]*src=")(.*?)(")')
 INVISIBLE_CHARS = [
     '\u034F',
@@ -111,6 +118,8 @@ INVISIBLE_CHARS = [
     '\u200C',
     '\u200D'
 ]
+# Removes `INVISIBLE_CHARS` with `str.translate` in a single pass.
+INVISIBLE_CHARS_TABLE = dict.fromkeys(map(ord, INVISIBLE_CHARS), None)
 
 class GroupedMessage(MutableSequence):
     data: list[bytes]
@@ -230,7 +239,9 @@ class MessageParser:
             ]
         """
         grouped: list[GroupedMessage] = []
-        current: GroupedMessage = GroupedMessage([])
+        # Parts are collected in a plain list and every group is created
+        # once, since `GroupedMessage` sorts its parts again on each append.
+        current: list[bytes] = []
 
         if not isinstance(raw_message, Iterable):
             return [raw_message]
@@ -240,15 +251,15 @@ class MessageParser:
                 for part_item in part:
                     if GROUP_PATTERN.match(part_item):
                         if current:
-                            grouped.append(current)
-                        current = GroupedMessage([part_item])
+                            grouped.append(GroupedMessage(current))
+                        current = [part_item]
                     else:
                         current.append(part_item)
             else:
                 current.append(part)
 
         if current:
-            grouped.append(current)
+            grouped.append(GroupedMessage(current))
 
         return grouped
 
@@ -373,6 +384,28 @@ class MessageParser:
 
         return []
 
+    @staticmethod
+    def get_modseq(grouped_message: GroupedMessage) -> int:
+        """
+        Get mod-sequence from `MODSEQ` fetch result, see RFC 7162.
+
+        Args:
+            message (bytes): Raw message bytes.
+
+        Returns:
+            int: Mod-sequence of the message, 0 if there is none.
+
+        Example:
+            >>> get_modseq(b'(UID ... FLAGS (\\Seen) MODSEQ (12111230047))')
+            12111230047
+        """
+        for _, message in grouped_message.sorted():
+            modseq_match = MODSEQ_PATTERN.search(message)
+            if modseq_match:
+                return int(modseq_match.group(1))
+
+        return 0
+
     @staticmethod
     def get_headers(grouped_message: GroupedMessage) -> MessageHeaders:
         """
@@ -415,13 +448,25 @@ class MessageParser:
         if message_index_contains_headers < 0:
             return headers
 
-        for field_type, field_pattern in MESSAGE_HEADER_PATTERN_MAP.items():
-            field = field_pattern.search(grouped_message[message_index_contains_headers])
-            field = field.group(1).decode() if field else ""
-            field = SPACE_PATTERN.sub(
-                " ",
-                MessageDecoder.utf8_header(field)
-            ).strip()
+        # Header block is read line by line once instead of searching
+        # it again for every field. Only the first occurrence of a field
+        # is kept and folded lines are joined to their field.
+        raw_fields: dict[str, list[bytes]] = {}
+        current_field = None
+        for line in grouped_message[message_index_contains_headers].split(b"\r\n"):
+            if line[:1] in (b" ", b"\t"):
+                if current_field is not None:
+                    current_field.append(line)
+                continue
+            name, separator, value = line.partition(b":")
+            field_type = MESSAGE_HEADER_FIELD_MAP.get(name.strip().lower()) if separator else None
+            current_field = None
+            if field_type and field_type not in raw_fields:
+                current_field = raw_fields[field_type] = [value]
+
+        for field_type in MESSAGE_HEADER_FIELD_MAP.values():
+            field = b" ".join(raw_fields.get(field_type, [])).decode()
+            field = " ".join(MessageDecoder.utf8_header(field).split())
 
             # Special cases
             if field_type in ["sender", "receivers", "cc", "bcc"]:
@@ -466,6 +511,83 @@ class MessageParser:
 
         return attachment_list
 
+    @staticmethod
+    def get_attachment_by_name(
+        grouped_message: GroupedMessage,
+        name: str,
+        cid: str = ""
+    ) -> tuple[tuple[str, int, str, str], str] | None:
+        """
+        Find the attachment with the given filename in `BODYSTRUCTURE`
+        fetch result and get its metadata and part number at once.
+
+        Args:
+            grouped_message (GroupedMessage): Grouped `BODYSTRUCTURE` fetch result.
+            name (str): Filename of the attachment.
+            cid (str, optional): Content ID of the attachment. Used to
+                distinguish attachments with the same filename.
+
+        Returns:
+            tuple[tuple[str, int, str, str], str] | None: Attachment as
+            ((filename, size, cid, mimetype/subtype), part) or None if
+            there is no such attachment.
+
+        Example:
+            >>> get_attachment_by_name(b'(BODYSTRUCTURE ... ("APPLICATION" "PDF" ...
+            ... ("ATTACHMENT" ("FILENAME" "file.pdf")) NIL) "MIXED" ...)', "file.pdf")
+            (("file.pdf", 1029, "", "application/pdf"), "2")
+        """
+        message = ""
+        for _, part_msg in grouped_message.sorted():
+            body_structure_match = BODYSTRUCTURE_PATTERN.search(part_msg.decode("utf-8"))
+            if body_structure_match:
+                message = body_structure_match.group(1)
+                break
+
+        if not message:
+            return None
+
+        stack = []
+        i = 0
+        for filename_match in FILENAME_PATTERN.finditer(message):
+            if filename_match.group(1) != name:
+                continue
+
+            # Keep track of the open blocks until the filename so the
+            # enclosing part can be found without parsing the rest.
+            while i < filename_match.start():
+                if message[i] == "(":
+                    stack.append(i)
+                elif message[i] == ")" and stack:
+                    stack.pop()
+                i += 1
+
+            # Enclosing blocks: ..., part, disposition.
+            if len(stack) < 2:
+                continue
+
+            attach_match = ATTACHMENT_LIST_PATTERN.match(message, stack[-2])
+            if not attach_match or attach_match.group(5) != name:
+                continue
+
+            attachment_cid = TAG_CLEANING_PATTERN.sub('', attach_match.group(3))
+            if cid and attachment_cid != TAG_CLEANING_PATTERN.sub('', cid):
+                continue
+
+            try:
+                attachment = (
+                    name,
+                    int(attach_match.group(4)),
+                    attachment_cid,
+                    f"{attach_match.group(1)}/{attach_match.group(2)}".lower()
+                )
+            except ValueError:
+                continue
+
+            return attachment, MessageParser._get_part_number(message, stack[-2])
+
+        return None
+
     @staticmethod
     def get_inline_attachment_list(grouped_message: GroupedMessage) -> list[tuple[str, int, str, str]]:
         """
@@ -588,30 +710,46 @@ class MessageParser:
         if not is_found:
             return None
 
-        part = "-1"
-        i = 0
-        s = 0
-        while i <= start:
-            prev = message[i - 1] if i > 0 else None
-            char = message[i]
-            next = message[i + 1] if i + 1 <= start else None
-            if char == "(":
-                s += 1
-                inc = int(part[part.rfind(".")+1:]) + 1
-                if prev == ")":
-                    part = part[:-1]
-                    part += str(inc)
-                elif next == "(":
-                    part = str(inc)
-                elif prev == "(":
-                    part = part + ".1" if part != "0" else "1"
-            elif char == ")":
-                s -= 1
-                if s == 1:
-                    part = part[0]
-            i += 1
+        return MessageParser._get_part_number(message, start)
+
+    @staticmethod
+    def _get_part_number(message: str, start: int) -> str:
+        """
+        Get the part number of the body part whose block opens at `start`
+        index of the given BODYSTRUCTURE. If the block is not a body part
+        (e.g. a parameter or disposition list) the part number of the
+        innermost body part containing it is returned.
+
+        Args:
+            message (str): BODYSTRUCTURE of the message.
+            start (int): Index of an opening parenthesis in the BODYSTRUCTURE.
 
-        return part
+        Returns:
+            str: The part number of the body part, e.g. "1", "2.1".
+        """
+        # Open blocks until `start`, [part, child count] for body parts
+        # and None for the other lists. Child bodies of a multipart
+        # directly follow its opening parenthesis or the previous child
+        # (RFC 3501 `body-type-mpart`), every other list follows a space.
+        stack: list[list | None] = []
+        for i in range(start + 1):
+            if message[i] == "(":
+                parent = stack[-1] if stack else None
+                if i == 0:
+                    stack.append(["", 0])
+                elif parent and message[i - 1] in "()":
+                    parent[1] += 1
+                    stack.append([f"{parent[0]}.{parent[1]}".lstrip("."), 0])
+                else:
+                    stack.append(None)
+            elif message[i] == ")" and stack:
+                stack.pop()
+
+        for block in reversed(stack):
+            if block:
+                return block[0] or "1"
+
+        return "1"
 
     @staticmethod
     def get_content_type_and_encoding(grouped_message: GroupedMessage) -> tuple[str, str]:
@@ -647,6 +785,55 @@ class MessageParser:
 
         return "", ""
 
+    @staticmethod
+    def get_body_part(grouped_message: GroupedMessage, part: str) -> tuple[bytes, str, str] | None:
+        """
+        Get the body of `part` together with its Content-Type and
+        Content-Transfer-Encoding from `BODY.PEEK[part] BODY.PEEK[part.MIME]`
+        fetch results. Literals are matched by their section, so other
+        sections fetched in the same response (e.g. headers) are skipped.
+
+        Args:
+            grouped_message (GroupedMessage): Grouped fetch result of an email.
+            part (str): Part number, e.g. "1", "1.2".
+
+        Returns:
+            tuple[bytes, str, str] | None: Body, content type and encoding
+            as (body, content_type, encoding), None if `part` is not in the
+            fetch result.
+
+        Example:
+            >>> get_body_part([
+            ...     b'1 (UID 5 BODY[1]<0> {5}', b'Hello',
+            ...     b' BODY[1.MIME] {54}', b'Content-Type: text/plain\\r\\nContent-Transfer-Encoding: 7bit', b')'
+            ... ], "1")
+            (b'Hello', 'text/plain', '7bit')
+        """
+        body = mime = None
+        part_as_bytes = part.upper().encode()
+        mime_as_bytes = part_as_bytes + b".MIME"
+        for index in range(len(grouped_message) - 1):
+            section_match = BODY_SECTION_PATTERN.search(grouped_message[index])
+            if not section_match:
+                continue
+            section = section_match.group(1).upper()
+            if section == part_as_bytes:
+                body = grouped_message[index + 1]
+            elif section == mime_as_bytes:
+                mime = grouped_message[index + 1]
+
+        if body is None:
+            return None
+
+        content_type = encoding = b""
+        if mime:
+            content_type_match = CONTENT_TYPE_PATTERN.search(mime)
+            encoding_match = CONTENT_TRANSFER_ENCODING_PATTERN.search(mime)
+            content_type = content_type_match.group(1) if content_type_match else b""
+            encoding = encoding_match.group(1) if encoding_match else b""
+
+        return body, content_type.decode(), encoding.decode()
+
     @staticmethod
     def get_body(grouped_message: GroupedMessage) -> str | bytes:
         """
@@ -779,8 +966,8 @@ class MessageDecoder:
             E0=B8=9')
             'สวัสดีชาวโลก' # "Hello World" in Thai
         """
-        if isinstance(message, bytes):
-            message = message.decode()
+        if isinstance(message, str):
+            message = message.encode("utf-8")
 
         try:
             decoded_partial_text = quopri.decodestring(message, header=False).decode("utf-8", errors="ignore")
@@ -805,13 +992,19 @@ class MessageDecoder:
             WsgacOnaW4gdXlndWxh")
             'Hello, World'
         """
-        if isinstance(message, bytes):
-            message = message.decode()
+        if isinstance(message, str):
+            message = message.encode("utf-8")
 
         try:
+            # Partially fetched messages(`BODY.PEEK[1]<0.4096>`) may end
+            # anywhere, so line breaks are not counted and an incomplete
+            # last character is dropped instead of padded.
+            message = b''.join(message.split())
             padding = len(message) % 4
-            if padding:
-                message += '=' * (4 - padding)
+            if padding == 1:
+                message = message[:-1]
+            elif padding:
+                message += b'=' * (4 - padding)
             decoded_text = base64.b64decode(message).decode("utf-8", errors="ignore")
         except Exception as e:
             decoded_text = str(e)
@@ -883,8 +1076,9 @@ class MessageDecoder:
                 "quoted-printable", "base64", or an empty string for plain text. Defaults to "".
             sanitize (bool, optional): If `True`, applies sanitization to remove unnecessary
                 characters such as links, brackets, and special symbols. Defaults to `False`.
-            parse (bool, optional): If `True`, parses the message as HTML content using an HTML parser
-                to extract meaningful text. Cannot be used together with `sanitize`. Defaults to `False`.
+            parse (bool, optional): If `True`, strips the HTML tags of the message to extract
+                meaningful text (see `HTMLParser.strip`). Cannot be used together with `sanitize`.
+                Defaults to `False`.
 
         Returns:
             str: Decoded (and optionally sanitized) message content.
@@ -899,23 +1093,21 @@ class MessageDecoder:
         if sanitize and parse:
             raise ValueError("Only one of 'parse' or 'sanitize' can be True at a time.")
 
-        if isinstance(message, bytes):
-            message = message.decode()
-
         if encoding == "quoted-printable":
             message = MessageDecoder.quoted_printable_message(message)
         elif encoding == "base64":
             message = MessageDecoder.base64_message(message)
+        elif isinstance(message, bytes):
+            message = message.decode()
 
         if sanitize:
-            message = ''.join(c for c in message if c not in INVISIBLE_CHARS)
+            message = message.translate(INVISIBLE_CHARS_TABLE)
             message = LINK_PATTERN.sub(' ', message)
             message = BRACKET_PATTERN.sub(' ', message)
             message = SPECIAL_CHAR_PATTERN.sub(' ', message)
-            message = SPACE_PATTERN.sub(' ', message)
-            message = message.strip()
+            message = ' '.join(message.split())
         elif parse:
-            message = HTMLParser.parse(message)
+            message = HTMLParser.strip(message)
 
         return message
 
@@ -943,7 +1135,7 @@ class _HTML2TextParser(BuiltInHTMLParser):
             self.text.append(data.strip())
 
     def get_text(self) -> str:
-        return SPACE_PATTERN.sub(' ', ' '.join(self.text)).strip()
+        return ' '.join(' '.join(self.text).split())
 
     def parse(self, html: str) -> str:
         self.feed(html)
@@ -978,6 +1170,34 @@ class HTMLParser():
         htmlParser = _HTML2TextParser()
         return htmlParser.parse(html)
 
+    @staticmethod
+    def strip(html_text: str) -> str:
+        """
+        Get plain text from given html string by removing tags with
+        regular expressions instead of parsing the document. Much
+        cheaper than `parse` but less accurate on malformed html, so
+        it is meant for previews rather than full content.
+
+        Example:
+            >>> strip('''
+            <html>
+              <head><title>Test</title></head>
+              <body>
+                <script>console.log("Hello");</script>
+                <h1>Welcome</h1>
+                <p>This is a <b>test</b> page &amp; more.</p>
+              </body>
+            </html>
+            ''')
+            "Test Welcome This is a test page & more."
+        """
+        text = SCRIPT_AND_STYLE_PATTERN.sub(' ', html_text)
+        text = TAG_PATTERN.sub(' ', text)
+        # Partially fetched bodies may end in the middle of a tag.
+        text = UNCLOSED_TAG_PATTERN.sub(' ', text)
+        text = html.unescape(text)
+        return ' '.join(text.split())
+
     @staticmethod
     def is_html(text: str) -> bool:
         """
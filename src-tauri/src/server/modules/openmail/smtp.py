@@ -18,6 +18,7 @@ import base64
 import smtplib
 import copy
 import re
+import time
 import urllib.request
 import urllib.parse
 import urllib.error
@@ -55,6 +56,18 @@ SMTP_SERVERS = MappingProxyType({
     'yandex': 'smtp.yandex.com',
 })
 SMTP_PORT = 587
+SUPPORTED_INLINE_IMAGE_TYPES = frozenset({
+    "image/png",
+    "image/jpg",
+    "image/jpeg",
+    "image/gif",
+    "image/bmp",
+    "image/webp",
+    "image/svg+xml",
+    "image/x-icon",
+    "image/vnd.microsoft.icon",
+    "image/tiff",
+})
 MAILTO_PATTERN = re.compile(r'<mailto:([^>]+)>', re.IGNORECASE | re.DOTALL)
 URL_PATTERN = re.compile(r'<(https?://[^>]+)>', re.IGNORECASE | re.DOTALL)
 
@@ -64,6 +77,10 @@ Custom consts
 MAX_ATTACHMENT_SIZE = 25 * 1024 * 1024 # 25MB
 MAX_INLINE_IMAGE_SIZE = 25 * 1024 * 1024 # 25MB
 DEFAULT_CONN_TIMEOUT = 30 # 30 seconds
+# Servers are allowed to drop a session after 5 minutes
+# of inactivity (RFC 5321 4.5.3.2.7), so the connection
+# is verified before sending if it was idle longer than this.
+KEEPALIVE_INTERVAL = 4 * 60 # 4 minutes
 
 class SMTPManager(smtplib.SMTP):
     """
@@ -95,14 +112,19 @@ class SMTPManager(smtplib.SMTP):
             timeout (int, optional): Timeout for the connection in seconds. Defaults to 30.
             source_address (tuple, optional): Source address for the connection. Defaults to None.
         """
+        host = host or self._find_smtp_server(email_address)
+        port = port or SMTP_PORT
         super().__init__(
-            host or self._find_smtp_server(email_address),
-            port or SMTP_PORT,
+            host,
+            port,
             local_hostname=local_hostname,
             timeout=choose_positive(timeout, DEFAULT_CONN_TIMEOUT),
             source_address=source_address
         )
 
+        self._server = (host, port)
+        self._credentials = (email_address, password)
+        self._last_used_at = time.monotonic()
         self.login(email_address, password)
 
     def _find_smtp_server(self, email_address: str) -> str:
@@ -144,6 +166,35 @@ class SMTPManager(smtplib.SMTP):
         except smtplib.SMTPAuthenticationError as e:
             raise SMTPManagerException(f"There was an error while logging in: {str(e)}") from None
 
+    def _ensure_connection(self) -> None:
+        """
+        Make sure the session is still usable before a command is sent.
+        The same connection is kept for the lifetime of the instance,
+        if it was idle longer than `KEEPALIVE_INTERVAL` it is checked
+        with `NOOP` and, if the server closed it, reconnected and logged
+        in again instead of failing the command.
+
+        Raises:
+            SMTPManagerException: If the reconnection fails.
+        """
+        if time.monotonic() - self._last_used_at < KEEPALIVE_INTERVAL:
+            return
+
+        try:
+            if self.noop()[0] == 250:
+                self._last_used_at = time.monotonic()
+                return
+        except (smtplib.SMTPException, OSError):
+            pass
+
+        try:
+            self.close()
+            self.connect(*self._server)
+            self.login(*self._credentials)
+            self._last_used_at = time.monotonic()
+        except Exception as e:
+            raise SMTPManagerException(f"Could not reconnect to the target smtp server: {str(e)}") from None
+
     @override
     def quit(self):
         """
@@ -231,28 +282,33 @@ class SMTPManager(smtplib.SMTP):
         except Exception as e:
             print(f"Error while adding metadata to headers: {str(e)} - Skipping metadata.")
 
-        # First payload, text/plain.
-        msg.set_content(HTMLParser.parse(draft.body))
+        # First payload, text/plain. Plain text bodies are used as they
+        # are, only html bodies need to be converted.
+        is_body_html = HTMLParser.is_html(draft.body)
+        msg.set_content(HTMLParser.parse(draft.body) if is_body_html else draft.body)
 
         # Extract inline attachments, create cid for inline attachments,
-        # and change the body with generated cids.
-        position_shift = 0
+        # and change the body with generated cids. Body is rebuilt once
+        # from its pieces instead of being copied for every image.
+        body_pieces = []
+        last_src_end = 0
         inline_attachments: list[Attachment] = []
         inline_attachments_cids = set()
         for match in MessageParser.get_inline_attachment_sources(draft.body):
             try:
                 inline_attachment = None
                 src_start, src_value, src_end = match
-                src_start, src_end = src_start + position_shift, src_end + position_shift
                 inline_attachment = AttachmentConverter.resolve_and_convert(src_value)
 
                 if inline_attachment.size > MAX_INLINE_IMAGE_SIZE:
                     raise SMTPManagerException("Inline image size exceeds the maximum allowed size.")
 
-                src_cid = f"cid:{inline_attachment.cid}"
-                draft.body = draft.body[:src_start] + src_cid + draft.body[src_end:]
+                if (inline_attachment.type or "").lower() not in SUPPORTED_INLINE_IMAGE_TYPES:
+                    raise SMTPManagerException(f"Unsupported inline image type `{inline_attachment.type}`.")
 
-                position_shift += len(src_cid) - (src_end - src_start)
+                body_pieces.append(draft.body[last_src_end:src_start])
+                body_pieces.append(f"cid:{inline_attachment.cid}")
+                last_src_end = src_end
 
                 if inline_attachment.cid in inline_attachments_cids:
                     print("Duplicate inline images found. Skipping MIME attachment.")
@@ -263,8 +319,13 @@ class SMTPManager(smtplib.SMTP):
             except Exception as e:
                 print(f"Error while converting inline attachment to base64 data: `{str(e)}` - Skipping inline image...")
 
+        if body_pieces:
+            body_pieces.append(draft.body[last_src_end:])
+            draft.body = "".join(body_pieces)
+            body_pieces.clear()
+
         # Second payload, text/html.
-        if HTMLParser.is_html(draft.body):
+        if is_body_html:
             msg.add_alternative(draft.body, subtype="html")
 
         # Attach inline attachments to `msg` according to their cid number.
@@ -334,8 +395,10 @@ class SMTPManager(smtplib.SMTP):
         mail_options: Sequence[str] = (),
         rcpt_options: Sequence[str] = ()
     ) -> SMTPCommandResult:
+        self._ensure_connection()
         try:
             # `send_message` func returns empty dict on success.
+            self._last_used_at = time.monotonic()
             return super().send_message(
                 msg,
                 from_addr,
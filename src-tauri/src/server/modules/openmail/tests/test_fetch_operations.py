@@ -1,5 +1,6 @@
 import base64
 import copy
+import itertools
 import json
 import math
 import re
@@ -8,7 +9,7 @@ from typing import cast
 import unittest
 
 from modules.openmail import Openmail
-from modules.openmail.imap import Mark, Folder
+from modules.openmail.imap import IMAPManager, Mark, Folder
 from modules.openmail.types import Draft, SearchCriteria
 from modules.openmail.parser import HTMLParser, MessageParser
 from modules.openmail.encoder import FileBase64Encoder
@@ -18,6 +19,18 @@ from .utils.dummy_operator import DummyOperator
 from .utils.name_generator import NameGenerator
 from .utils.sample_file_generator import SampleImageGenerator
 
+# Reference grammar of `IMAPManager._parse_sequence_set`
+SEQUENCE_SET_PATTERN = re.compile(
+    r"""
+    ^(
+        (\d+(,|:))*\d+$ |
+        \*:((\d+(,|:))*\d+)?$ |
+        ((\d+(,|:))*\d+:)?\*$
+    )$
+""",
+    re.VERBOSE,
+)
+
 class TestFetchOperations(unittest.TestCase):
 
     @classmethod
@@ -120,6 +133,36 @@ class TestFetchOperations(unittest.TestCase):
         for invalid_input in invalid_inputs:
             self.assertFalse(self.__class__._openmail.imap._is_sequence_set_valid(invalid_input, fake_uids))
 
+    def test_parse_sequence_set_matches_reference_pattern(self):
+        print("test_parse_sequence_set_matches_reference_pattern...")
+        for length in range(1, 7):
+            for chars in itertools.product("1*:,", repeat=length):
+                sequence_set = "".join(chars)
+                if sequence_set == "*:": # Accepted by the pattern but has no end.
+                    continue
+                self.assertEqual(
+                    bool(SEQUENCE_SET_PATTERN.match(sequence_set)),
+                    IMAPManager._parse_sequence_set(sequence_set) is not None,
+                    sequence_set
+                )
+
+    def test_build_sequence_set(self):
+        print("test_build_sequence_set...")
+        self.assertEqual(IMAPManager._build_sequence_set([9, 7, 6, 5, 3, 1]), "1,3,5:7,9")
+        for length in range(1, 7):
+            for uids in itertools.combinations(range(1, 9), length):
+                intervals = IMAPManager._parse_sequence_set(IMAPManager._build_sequence_set(uids))
+                self.assertEqual(
+                    [uid for start, end in cast(list, intervals) for uid in range(start, end + 1)],
+                    list(uids)
+                )
+
+    def test_compact_sequence_set(self):
+        print("test_compact_sequence_set...")
+        self.assertEqual(IMAPManager._compact_sequence_set("1,3,4,5,7,8,9"), "1,3:5,7:9")
+        self.assertEqual(IMAPManager._compact_sequence_set("9:3,1,2,10"), "1:10")
+        self.assertEqual(IMAPManager._compact_sequence_set("5:*,1"), "5:*,1")
+
     def test_is_email_exists(self):
         print("test_is_email_exists...")
 
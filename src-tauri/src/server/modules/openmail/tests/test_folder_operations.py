@@ -81,6 +81,15 @@ class TestFolderOperations(unittest.TestCase):
         folders = self.__class__._openmail.imap.get_folders(tagged=False)
         self.assertFalse(any(folder.split(":")[0].lower() in FOLDER_LIST for folder in folders if len(folder.split(":")) > 1))
 
+    def test_extract_folder_name(self):
+        print("test_extract_folder_name...")
+        imap = self.__class__._openmail.imap
+        self.assertEqual(imap._extract_folder_name(b'(\\HasNoChildren) "/" "INBOX"'), "INBOX")
+        self.assertEqual(imap._extract_folder_name(b'(\\Junk \\HasNoChildren) "|" "[Gmail]/Spam"'), "[Gmail]/Spam")
+        self.assertEqual(imap._extract_folder_name(b'(\\Junk \\HasNoChildren) "|" "[Gmail]/Spam"', tagged=True), "Junk:[Gmail]/Spam")
+        self.assertEqual(imap._extract_folder_name(b'(\\HasNoChildren) "|" "MyCustomFolder"'), "MyCustomFolder")
+        self.assertEqual(imap._extract_folder_name(b'(\\HasNoChildren) NIL "Trash Bin"'), "Trash Bin")
+
     def test_create_folder_operation(self):
         print("test_create_folder_operation...")
         folder_name = NameGenerator.folder_name()[0]
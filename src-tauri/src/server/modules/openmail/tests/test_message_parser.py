@@ -0,0 +1,107 @@
+import unittest
+
+from modules.openmail.parser import MessageParser, GroupedMessage
+
+# multipart/mixed
+#   1     multipart/related
+#   1.1   multipart/alternative
+#   1.1.1 text/plain
+#   1.1.2 text/html
+#   1.2   image/png (inline, red.png)
+#   2     application/pdf (attachment, report.pdf, <first>)
+#   3     application/pdf (attachment, report.pdf, <second>)
+NESTED_BODYSTRUCTURE = (
+    b'1 (UID 1 BODYSTRUCTURE (((("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 55 2 NIL NIL NIL)'
+    b'("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 120 4 NIL NIL NIL) "ALTERNATIVE" '
+    b'("BOUNDARY" "==alternative==") NIL NIL)'
+    b'("IMAGE" "PNG" NIL "<red>" NIL "BASE64" 1704 NIL ("INLINE" ("FILENAME" "red.png")) NIL) '
+    b'"RELATED" ("BOUNDARY" "==related==") NIL NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "report.pdf") "<first>" NIL "BASE64" 1111 NIL '
+    b'("ATTACHMENT" ("FILENAME" "report.pdf")) NIL)'
+    b'("APPLICATION" "PDF" ("NAME" "report.pdf") "<second>" NIL "BASE64" 2222 NIL '
+    b'("ATTACHMENT" ("FILENAME" "report.pdf")) NIL) "MIXED" ("BOUNDARY" "==mixed==") NIL NIL))'
+)
+
+# multipart/mixed
+#   1     text/plain
+#   2     multipart/mixed
+#   2.1   text/html
+#   2.2   application/pdf (attachment, inner.pdf)
+#   3     application/zip (attachment, outer.zip)
+SIBLING_BODYSTRUCTURE = (
+    b'2 (UID 2 BODYSTRUCTURE (("TEXT" "PLAIN" ("CHARSET" "utf-8") NIL NIL "7BIT" 55 2 NIL NIL NIL)'
+    b'(("TEXT" "HTML" ("CHARSET" "utf-8") NIL NIL "7BIT" 120 4 NIL NIL NIL)'
+    b'("APPLICATION" "PDF" NIL "<inner>" NIL "BASE64" 3333 NIL ("ATTACHMENT" ("FILENAME" "inner.pdf")) NIL) '
+    b'"MIXED" ("BOUNDARY" "==inner==") NIL NIL)'
+    b'("APPLICATION" "ZIP" NIL "<outer>" NIL "BASE64" 4444 NIL ("ATTACHMENT" ("FILENAME" "outer.zip")) NIL) '
+    b'"MIXED" ("BOUNDARY" "==outer==") NIL NIL))'
+)
+
+SINGLE_PART_BODYSTRUCTURE = (
+    b'3 (UID 3 BODYSTRUCTURE ("APPLICATION" "PDF" NIL "<only>" NIL "BASE64" 5555 NIL '
+    b'("ATTACHMENT" ("FILENAME" "only.pdf")) NIL))'
+)
+
+class TestMessageParser(unittest.TestCase):
+    def test_get_part_nested(self):
+        print("test_get_part_nested...")
+        grouped_message = GroupedMessage([NESTED_BODYSTRUCTURE])
+        self.assertEqual(MessageParser.get_part(grouped_message, ["TEXT", "PLAIN"]), "1.1.1")
+        self.assertEqual(MessageParser.get_part(grouped_message, ["TEXT", "HTML"]), "1.1.2")
+        self.assertEqual(MessageParser.get_part(grouped_message, ['"red.png"']), "1.2")
+
+        grouped_message = GroupedMessage([SIBLING_BODYSTRUCTURE])
+        self.assertEqual(MessageParser.get_part(grouped_message, ["TEXT", "PLAIN"]), "1")
+        self.assertEqual(MessageParser.get_part(grouped_message, ["TEXT", "HTML"]), "2.1")
+
+    def test_get_attachment_by_name_nested(self):
+        print("test_get_attachment_by_name_nested...")
+        grouped_message = GroupedMessage([SIBLING_BODYSTRUCTURE])
+        for name, cid, part, attachment in [
+            ("inner.pdf", "inner", "2.2", ("inner.pdf", 3333, "inner", "application/pdf")),
+            ("outer.zip", "outer", "3", ("outer.zip", 4444, "outer", "application/zip")),
+        ]:
+            self.assertEqual(
+                MessageParser.get_attachment_by_name(grouped_message, name),
+                (attachment, part)
+            )
+            self.assertEqual(
+                MessageParser.get_part(grouped_message, [f'"{name}"', cid]),
+                part
+            )
+
+    def test_get_attachment_by_name_with_same_names(self):
+        print("test_get_attachment_by_name_with_same_names...")
+        grouped_message = GroupedMessage([NESTED_BODYSTRUCTURE])
+
+        # First one is found without cid.
+        self.assertEqual(
+            MessageParser.get_attachment_by_name(grouped_message, "report.pdf"),
+            (("report.pdf", 1111, "first", "application/pdf"), "2")
+        )
+        for cid, part, size in [("<first>", "2", 1111), ("second", "3", 2222)]:
+            self.assertEqual(
+                MessageParser.get_attachment_by_name(grouped_message, "report.pdf", cid),
+                (("report.pdf", size, cid.strip("<>"), "application/pdf"), part)
+            )
+            self.assertEqual(
+                MessageParser.get_part(grouped_message, ['"report.pdf"', cid.strip("<>")]),
+                part
+            )
+
+    def test_get_attachment_by_name_single_part(self):
+        print("test_get_attachment_by_name_single_part...")
+        grouped_message = GroupedMessage([SINGLE_PART_BODYSTRUCTURE])
+        self.assertEqual(
+            MessageParser.get_attachment_by_name(grouped_message, "only.pdf"),
+            (("only.pdf", 5555, "only", "application/pdf"), "1")
+        )
+        self.assertEqual(MessageParser.get_part(grouped_message, ['"only.pdf"']), "1")
+
+    def test_get_attachment_by_name_not_found(self):
+        print("test_get_attachment_by_name_not_found...")
+        grouped_message = GroupedMessage([NESTED_BODYSTRUCTURE])
+        # Inline attachments are not listed by `get_attachment_list` either.
+        self.assertIsNone(MessageParser.get_attachment_by_name(grouped_message, "red.png"))
+        self.assertIsNone(MessageParser.get_attachment_by_name(grouped_message, "missing.pdf"))
+        self.assertIsNone(MessageParser.get_attachment_by_name(grouped_message, "report.pdf", "third"))
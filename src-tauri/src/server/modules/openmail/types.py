@@ -47,7 +47,7 @@ class SearchCriteria():
         except json.JSONDecodeError:
             return raw
 
-@dataclass
+@dataclass(slots=True)
 class Email():
     """Represents a basic email."""
     message_id: str
@@ -99,20 +99,20 @@ class Draft():
         """Returns a list of all field names in the dataclass instance."""
         return [field.name for field in fields(self)]
 
-@dataclass
+@dataclass(slots=True)
 class Mailbox():
     """Represents the mailbox's contents."""
     folder: str
     emails: list[Email]
     total: int
 
-@dataclass
+@dataclass(slots=True)
 class Flags():
     """Represents an email's flags."""
     uid: str
     flags: list[str]
 
-@dataclass
+@dataclass(slots=True)
 class Attachment():
     """Represents an email attachment."""
     name: str
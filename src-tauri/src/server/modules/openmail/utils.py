@@ -38,7 +38,7 @@ def choose_positive(var1: int, var2: int) -> int:
 
 def contains_non_ascii(string: str) -> bool:
     """Check if a string contains any non-ASCII characters."""
-    return any(ord(char) > 127 for char in string)
+    return not string.isascii()
 
 def tuple_to_sender_string(sender: tuple[str, str] | str) -> str:
     """Formats the sender's name and email into a single string."""
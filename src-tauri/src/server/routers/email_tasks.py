@@ -62,21 +62,49 @@ async def notifications_socket(websocket: WebSocket, account: str):
                     break
 
             # Listen for new messages and send notification when
-            # any new message received.
-            while True:
-                try:
-                    await asyncio.sleep(NEW_EMAIL_CHECK_INTERVAL_SEC)
+            # any new message received. IDLE wakes the loop up as soon
+            # as the server pushes a new message, the interval is only
+            # a fallback in case a notification is missed.
+            loop = asyncio.get_running_loop()
+            new_email_received = asyncio.Event()
+            def notify_new_email():
+                loop.call_soon_threadsafe(new_email_received.set)
+
+            # Listener is registered once per client and always removed
+            # when the loop ends, even if the task is cancelled, so no
+            # callback is left pointing to a closed event loop.
+            openmail_client = None
+            try:
+                openmail_client = client_handler.get_client(account, True)
+                openmail_client.imap.add_new_message_listener(notify_new_email)
+                while True:
+                    try:
+                        await asyncio.wait_for(
+                            new_email_received.wait(),
+                            NEW_EMAIL_CHECK_INTERVAL_SEC
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+                    new_email_received.clear()
                     print(f"Checking for new emails for {account}")
-                    openmail_client = client_handler.get_client(account, True)
+                    current_client = client_handler.get_client(account, True)
+                    if current_client is not openmail_client:
+                        # Client is reconnected, listen to the new one.
+                        openmail_client.imap.remove_new_message_listener(notify_new_email)
+                        openmail_client = current_client
+                        openmail_client.imap.add_new_message_listener(notify_new_email)
                     if openmail_client.imap.any_new_email():
                         print(f"Account {account} has new emails")
                         recent_emails = openmail_client.imap.get_recent_emails()
                         await websocket.send_json({account: recent_emails})
                         uvicorn_logger.websocket(websocket, recent_emails)
-                except Exception as e:
-                    await websocket.close(reason="There was an error while receving new emails.")
-                    uvicorn_logger.websocket(websocket, e)
-                    break
+            except Exception as e:
+                await websocket.close(reason="There was an error while receving new emails.")
+                uvicorn_logger.websocket(websocket, e)
+                break
+            finally:
+                if openmail_client:
+                    openmail_client.imap.remove_new_message_listener(notify_new_email)
     except WebSocketDisconnect:
         pass
 
@@ -144,12 +172,16 @@ async def get_mailbox(
             if isinstance(search_loaded, dict):
                 search_criteria = SearchCriteria(**search_loaded)
 
-        client_handler.get_client(account).imap.search_emails(folder, search_criteria)
+        imap = client_handler.get_client(account).imap
+        # Search and fetch leave IDLE mode only once.
+        with imap.idle_paused():
+            imap.search_emails(folder, search_criteria)
+            mailbox = imap.get_emails(offset_start, offset_end)
 
         return Response(
             success=True,
             message="Emails fetched successfully.",
-            data={account: client_handler.get_client(account).imap.get_emails(offset_start, offset_end)}
+            data={account: mailbox}
         )
     except Exception as e:
         return Response(success=False, message=err_msg("There was an error while fetching emails.", str(e)))
@@ -1,14 +1,17 @@
 import re
-import json
 import random
 import time
 from typing import Any
 
+import orjson
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
+
 def get_key_by_value(obj: dict, value: Any) -> str | None:
     return next((k for k, v in obj.items() if v == value), None)
 
 def is_email_valid(email: str) -> bool:
-    return bool(re.match(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$', email))
+    return bool(EMAIL_PATTERN.match(email))
 
 def make_size_human_readable(size: int | None) -> str:
     if size is None:
@@ -28,12 +31,11 @@ def generate_random_id() -> str:
     return f"{epoch_time}{random_part}"
 
 def safe_json_loads(value: bytes | str) -> dict | list | str:
-    if isinstance(value, bytes):
-        value = value.decode()
+    # orjson parses bytes directly, no need to decode them first.
     try:
-        return json.loads(value)
-    except (json.JSONDecodeError, TypeError):
-        return value
+        return orjson.loads(value)
+    except (orjson.JSONDecodeError, TypeError):
+        return value.decode() if isinstance(value, bytes) else value
 
 def err_msg(message: str, traceback: str) -> str:
     return f"{message}\nError: {traceback}"